@@ -0,0 +1,302 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")  # Headless: everything is drawn into in-memory buffers
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+gui_dir = os.path.join(repo_dir, "voice_record_and_analyze_gui")
+mfa_dir = os.path.join(repo_dir, "voice_phonemes_and_words_time_calc_MFA")
+corpus_dir = os.path.join(repo_dir, "Non_Native_Kids_Voice_Database")
+textgrid_dir = os.path.join(mfa_dir, "noisy_and_clean_voice")
+sys.path[:0] = [gui_dir, mfa_dir]
+
+FS = 16000
+BLOCK = 512  # frames per PortAudio callback at the GUI's 16 kHz input stream
+
+
+def timed(function, repeat=5):
+    # Median wall time of repeat calls, and the last return value
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), value
+
+
+def session_audio(seconds):
+    # Corpus recordings played back to back until the session is long enough
+    from corpus_reader import CorpusReader
+
+    reader = CorpusReader(corpus_dir)
+    pieces, total = [], 0
+    for recording_id in reader.recording_ids():
+        piece = reader.segment(recording_id)
+        pieces.append(piece)
+        total += len(piece)
+        if total >= seconds * FS:
+            break
+    audio = np.concatenate(pieces)
+    return np.resize(audio, int(seconds * FS))  # repeats the corpus if it is shorter
+
+
+def bench_capture(minutes):
+    # AudioBuffer.capture, the body of AudioRecorderApp.audio_callback, for
+    # every block of a session, then the copy stop_recording takes. Times
+    # are per callback: anything near BLOCK / FS (32 ms) would drop audio.
+    from audio_buffer import AudioBuffer
+
+    results = {}
+    block = session_audio(BLOCK / FS * 64).reshape(-1, BLOCK, 1)
+    for session in minutes:
+        buffer = AudioBuffer(block_size=FS * 30)
+        n_callbacks = int(session * 60 * FS) // BLOCK
+        durations = np.empty(n_callbacks)
+        for i in range(n_callbacks):
+            indata = block[i % len(block)]
+            start = time.perf_counter()
+            buffer.capture(indata, None)
+            durations[i] = time.perf_counter() - start
+        stop, audio = timed(buffer.view, repeat=1)
+        assert len(audio) == n_callbacks * BLOCK
+        results[f"{session:g}min"] = {
+            "callback_mean_s": float(durations.mean()),
+            "callback_p99_s": float(np.percentile(durations, 99)),
+            "callback_max_s": float(durations.max()),
+            "stop_view_s": stop,
+        }
+    return results
+
+
+def bench_rendering(minutes):
+    # The GUI's post-recording plots drawn with Agg at its figure size:
+    # waveform (pyramid + line) and spectrogram (STFT + image), then
+    # moving the selected-word span, which only blits.
+    from recording_analysis import RecordingAnalysis
+    from span_overlay import SpanHighlighter
+    from waveform_pyramid import WaveformPyramid, WaveformView
+
+    results = {}
+    for session in minutes:
+        audio = session_audio(session * 60)
+
+        def waveform():
+            fig, ax = plt.subplots(figsize=(5, 2.5))
+            WaveformView(ax, WaveformPyramid(audio, FS), label="Waveform")
+            fig.canvas.draw()
+            return fig
+
+        def spectrogram():
+            fig, ax = plt.subplots(figsize=(5, 2.5))
+            Z, extent = RecordingAnalysis(audio, FS).spectrogram_image()
+            im = ax.imshow(Z, cmap="viridis", extent=extent, origin="upper")
+            ax.axis("auto")
+            fig.colorbar(im, ax=ax)
+            fig.canvas.draw()
+            return fig
+
+        waveform_s, fig = timed(waveform, repeat=3)
+        plt.close(fig)
+        spectrogram_s, fig = timed(spectrogram, repeat=3)
+        highlight = SpanHighlighter(fig.axes[0])
+        fig.canvas.draw()
+        starts = np.linspace(0, session * 60 - 1, 50)
+        highlight_s, _ = timed(lambda: [highlight.show(t, t + 0.5) for t in starts], repeat=3)
+        plt.close(fig)
+        results[f"{session:g}min"] = {
+            "waveform_s": waveform_s,
+            "spectrogram_s": spectrogram_s,
+            "highlight_s": highlight_s / len(starts),
+        }
+    return results
+
+
+def bench_textgrid_export(copies):
+    # TextGrid -> CSV for the bundled alignments, each file copied under
+    # `copies` names: one file at a time, and the whole folder through
+    # the incremental process-pool conversion
+    from mfa_export import convert_textgrid_with_tiers_to_csv, export_file
+
+    sources = sorted(os.path.join(textgrid_dir, f) for f in os.listdir(textgrid_dir) if f.endswith(".TextGrid"))
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, "textgrids")
+        os.makedirs(input_dir)
+        for i in range(copies):
+            for path in sources:
+                shutil.copy(path, os.path.join(input_dir, f"{i:04d}_{os.path.basename(path)}"))
+        paths = sorted(os.path.join(input_dir, f) for f in os.listdir(input_dir))
+
+        serial_s, _ = timed(lambda: [export_file(path, os.path.join(tmp, "serial")) for path in paths], repeat=3)
+        with contextlib.redirect_stdout(io.StringIO()):  # one progress line per file
+            pool_s, _ = timed(lambda: convert_textgrid_with_tiers_to_csv(input_dir, os.path.join(tmp, "pool"),
+                                                                         force=True), repeat=3)
+            unchanged_s, _ = timed(lambda: convert_textgrid_with_tiers_to_csv(input_dir, os.path.join(tmp, "pool")),
+                                   repeat=3)
+        rows = 0
+        for root, _, names in os.walk(os.path.join(tmp, "serial")):
+            for name in names:
+                if name.endswith(".csv"):
+                    with open(os.path.join(root, name), encoding="utf-8") as f:
+                        rows += sum(1 for _ in f) - 1
+    return {
+        "files": len(paths),
+        "rows": rows,
+        "serial_per_file_s": serial_s / len(paths),
+        "pool_per_file_s": pool_s / len(paths),
+        "unchanged_rerun_s": unchanged_s,
+    }
+
+
+def bench_whisper(limit, model_name="tiny"):
+    # Realtime factor (processing time / audio time) of the Whisper model
+    # on CPU over the first corpus recordings, file by file and batched.
+    # Skipped when whisper or the model is not available.
+    try:
+        import torch
+        import batch_transcription
+        import transcription
+        from corpus_reader import CorpusReader
+        from whisper_models import get_model
+
+        get_model(model_name, "cpu")
+    except (ImportError, OSError, RuntimeError) as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+    reader = CorpusReader(corpus_dir)
+    clips = [reader.segment_pcm(r) for r in reader.recording_ids()[:limit]]
+    audio_seconds = sum(len(clip) for clip in clips) / FS
+    per_file_s, _ = timed(lambda: [transcription.transcribe(clip, model_name, device="cpu", cache=False)
+                                   for clip in clips], repeat=1)
+    batched_s, _ = timed(lambda: batch_transcription.transcribe_batch(clips, model_name, device="cpu", cache=False,
+                                                                      batch_size=8), repeat=1)
+    return {
+        "files": len(clips),
+        "audio_seconds": audio_seconds,
+        "threads": torch.get_num_threads(),
+        "rtf": per_file_s / audio_seconds,
+        "batched_rtf": batched_s / audio_seconds,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metrics(results, prefix=""):
+    # Flattens the nested results to {"capture/1min/callback_mean_s": value}
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict):
+            flat.update(metrics(value, f"{prefix}{name}/"))
+        else:
+            flat[prefix + name] = value
+    return flat
+
+
+def is_timing(name):
+    # Single worst-case samples are too noisy to gate a release on
+    return (name.endswith("_s") or name.endswith("rtf")) and not name.endswith("_max_s")
+
+
+def compare(results, baseline, tolerance):
+    # (name, baseline, current, ratio, regressed) for every timing present
+    # in both runs; a timing regresses when it grew by more than tolerance
+    current, previous = metrics(results), metrics(baseline)
+    rows = []
+    for name, value in current.items():
+        if is_timing(name) and name in previous and previous[name]:
+            ratio = value / previous[name]
+            rows.append((name, previous[name], value, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def print_results(results):
+    for name, value in metrics(results).items():
+        if name.endswith("_s"):
+            value = f"{value * 1000:.3f} ms" if value < 1 else f"{value:.3f} s"
+        elif isinstance(value, float):
+            value = f"{value:.4g}"
+        print(f"{name:<48}{value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the recording, plotting, transcription and MFA export paths.")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               "benchmark_results.json"),
+                        help="results JSON to write (default: benchmarks/benchmark_results.json)")
+    parser.add_argument("-b", "--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown before a timing counts as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--only", nargs="+", choices=["capture", "rendering", "textgrid_export", "whisper"],
+                        help="run only these groups")
+    parser.add_argument("--capture-minutes", type=float, nargs="+", default=[1, 5, 10, 30])
+    parser.add_argument("--render-minutes", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--textgrid-copies", type=int, default=50)
+    parser.add_argument("--whisper-files", type=int, default=10)
+    args = parser.parse_args()
+
+    groups = {
+        "capture": lambda: bench_capture(args.capture_minutes),
+        "rendering": lambda: bench_rendering(args.render_minutes),
+        "textgrid_export": lambda: bench_textgrid_export(args.textgrid_copies),
+        "whisper": lambda: bench_whisper(args.whisper_files),
+    }
+    results = {}
+    for name, run in groups.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"Running {name}...")
+        results[name] = run()
+
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_results(results)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline["results"], args.tolerance)
+        print(f"\nAgainst {args.baseline} ({baseline['meta'].get('revision')}, {baseline['meta'].get('date')}):")
+        for name, before, after, ratio, regressed in rows:
+            print(f"{name:<48}{before:>12.4g}{after:>12.4g}{ratio:>8.2f}x{'  REGRESSION' if regressed else ''}")
+        regressions = sum(row[4] for row in rows)
+        print(f"{regressions} of {len(rows)} timings slower than the baseline by more than {args.tolerance:.0%}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import contextlib
+import csv
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from textgrid_reader import read_tiers
+
+
+# Output folder and label column per MFA tier; other tiers get "<tier>_time_csv"
+tier_outputs = {
+    "words": ("words_time_csv", "Word"),
+    "phones": ("phonemes_time_csv", "Phoneme"),
+}
+
+
+manifest_name = ".mfa_export_manifest.json"  # in output_dir; one section per output format
+parquet_dir = "alignments_parquet"  # <output_dir>/alignments_parquet/<tier>/speaker=<id>/<recording>.parquet
+speaker_pattern = re.compile(r"^([A-Za-z]+\d+)_")  # F10_01_01 -> F10
+
+
+def speaker_of(recording_id):
+    match = speaker_pattern.match(recording_id)
+    return match.group(1) if match else recording_id
+
+
+def tier_output(tier_name):
+    return tier_outputs.get(tier_name, (f"{tier_name}_time_csv", "Label"))
+
+
+def tier_columns(tier):
+    # Non-empty intervals of a tier as (labels, starts, ends)
+    keep = tier.nonempty()
+    labels = [text.strip() for text in tier.texts()[keep]]
+    return labels, tier.starts[keep], tier.ends[keep]
+
+
+def parent_index(child_starts, child_ends, parent_starts, parent_ends):
+    # Row of the parent interval containing each child's midpoint, -1 if none
+    if len(parent_starts) == 0:
+        return np.full(len(child_starts), -1, dtype=np.int64)
+    mid = (child_starts + child_ends) / 2
+    index = np.searchsorted(parent_starts, mid, side="right") - 1
+    inside = (index >= 0) & (mid < parent_ends[np.maximum(index, 0)])
+    return np.where(inside, index, -1)
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    # Yields a temporary path in the target folder that replaces `path` only
+    # once the block finishes, so readers never see a half-written file.
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_csv(output_dir, recording_id, name, labels, starts, ends, word_index):
+    folder, label_header = tier_output(name)
+    header = [label_header, "Start_Time(sec)", "End_Time(sec)", "Duration(sec)"]
+    extra = []
+    if word_index is not None:
+        header.append("Word_Index")
+        extra = [word_index.tolist()]
+
+    output_file_path = os.path.join(output_dir, folder, recording_id + ".csv")
+    with atomic_path(output_file_path) as tmp_path, open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerow(header)
+        for row in zip(labels, starts.tolist(), ends.tolist(), *extra):
+            text, start_time, end_time = row[:3]
+            duration = end_time - start_time
+            csv_writer.writerow([text, f"{start_time:.3f}", f"{end_time:.3f}", f"{duration:.3f}", *row[3:]])
+    return output_file_path
+
+
+def write_parquet(output_dir, recording_id, name, labels, starts, ends, word_index):
+    # One file per recording inside a hive-partitioned dataset, so the
+    # corpus reads as a single table and filters on speaker skip whole
+    # directories.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = {
+        "recording_id": pa.array([recording_id] * len(labels)).dictionary_encode(),
+        "label": pa.array(labels, type=pa.string()).dictionary_encode(),
+        "start": pa.array(starts, type=pa.float64()),
+        "end": pa.array(ends, type=pa.float64()),
+        "duration": pa.array((ends - starts).astype(np.float32), type=pa.float32()),
+    }
+    if word_index is not None:
+        columns["word_index"] = pa.array(word_index.astype(np.int32), type=pa.int32())
+
+    folder = os.path.join(output_dir, parquet_dir, name, f"speaker={speaker_of(recording_id)}")
+    output_file_path = os.path.join(folder, recording_id + ".parquet")
+    with atomic_path(output_file_path) as tmp_path:
+        pq.write_table(pa.table(columns), tmp_path)
+    return output_file_path
+
+
+writers = {"csv": write_csv, "parquet": write_parquet}
+
+
+def export_file(tg_path, output_dir, output_format="csv"):
+    # Parses one TextGrid once and writes every tier of it. Phone rows carry
+    # the row index of their word in the words output.
+    recording_id = os.path.splitext(os.path.basename(tg_path))[0]
+    tiers = {name: tier_columns(tier) for name, tier in read_tiers(tg_path).items()}
+
+    outputs = []
+    for name, (labels, starts, ends) in tiers.items():
+        word_index = None
+        if name == "phones" and "words" in tiers:
+            word_index = parent_index(starts, ends, tiers["words"][1], tiers["words"][2])
+        outputs.append(writers[output_format](output_dir, recording_id, name, labels, starts, ends, word_index))
+    return outputs
+
+
+def _export(args):
+    tg_path, output_dir, output_format = args
+    try:
+        return tg_path, export_file(tg_path, output_dir, output_format), None
+    except Exception as e:
+        return tg_path, [], e
+
+
+def read_alignments(output_dir, tier="words", speakers=None, columns=None):
+    # Loads a Parquet export back as one pyarrow Table. Speaker filters are
+    # pushed down to the partition directories.
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(os.path.join(output_dir, parquet_dir, tier), format="parquet", partitioning="hive")
+    expression = ds.field("speaker").isin(list(speakers)) if speakers else None
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ExportManifest:
+    # Remembers, per output format, the mtime, size and SHA-256 of every
+    # exported TextGrid (keyed by its absolute path, so several input
+    # folders can share one output_dir) and the files written from it
+    # (relative to output_dir). A source is re-exported only when its size
+    # or mtime moved and its content hash actually changed, or when an
+    # output went missing.
+    def __init__(self, output_dir, output_format):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, manifest_name)
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+        self.entries = self.data.setdefault(output_format, {})
+        for name in [name for name in self.entries if not os.path.isabs(name)]:
+            del self.entries[name]  # Older manifests keyed by file name; those files are exported again
+
+    def is_current(self, name, tg_path):
+        entry = self.entries.get(name)
+        if entry is None:
+            return False
+        if not all(os.path.exists(os.path.join(self.output_dir, output)) for output in entry["outputs"]):
+            return False
+        stat = os.stat(tg_path)
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if stat.st_size != entry["size"] or file_hash(tg_path) != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = stat.st_mtime_ns  # touched but unchanged
+        return True
+
+    def record(self, name, tg_path, outputs):
+        # Returns the outputs this source produced last time but not now
+        stat = os.stat(tg_path)
+        outputs = [os.path.relpath(output, self.output_dir) for output in outputs]
+        previous = self.entries.get(name, {}).get("outputs", [])
+        self.entries[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(tg_path),
+            "outputs": outputs,
+        }
+        return [output for output in previous if output not in outputs]
+
+    def forget(self, name):
+        return self.entries.pop(name, {}).get("outputs", [])
+
+    def orphans(self, source_dir, sources):
+        # Entries of TextGrids that were in source_dir but are gone now
+        source_dir = os.path.abspath(source_dir)
+        return sorted(name for name in self.entries if os.path.dirname(name) == source_dir and name not in sources)
+
+    def remove_outputs(self, outputs):
+        # Outputs another source still claims (same recording id in another
+        # input folder) are left alone
+        claimed = {output for entry in self.entries.values() for output in entry["outputs"]}
+        for output in outputs:
+            if output in claimed:
+                continue
+            path = os.path.join(self.output_dir, output)
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"Removed: {path}")
+
+    def save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with atomic_path(self.path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1, sort_keys=True)
+
+
+def convert_textgrid_with_tiers_to_csv(input_dir, output_dir, workers=None, output_format="csv", force=False):
+    textgrid_files = sorted(f for f in os.listdir(input_dir) if f.endswith(".TextGrid"))
+    sources = [os.path.abspath(os.path.join(input_dir, f)) for f in textgrid_files]
+    manifest = ExportManifest(output_dir, output_format)
+
+    # Outputs of TextGrids that were deleted from this input_dir since the last run
+    for name in manifest.orphans(input_dir, set(sources)):
+        manifest.remove_outputs(manifest.forget(name))
+
+    changed = [path for path in sources if force or not manifest.is_current(path, path)]
+    if not textgrid_files:
+        print("No TextGrid files found in the input directory.")
+    elif not changed:
+        print(f"All {len(textgrid_files)} TextGrid files are up to date.")
+    else:
+        print(f"Exporting {len(changed)} of {len(textgrid_files)} TextGrid files.")
+
+    tasks = [(path, output_dir, output_format) for path in changed]
+    try:
+        if tasks:
+            with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(tasks))) as executor:
+                for tg_path, outputs, error in executor.map(_export, tasks, chunksize=16):
+                    tg_file = os.path.basename(tg_path)
+                    if error is not None:
+                        print(f"Error processing {tg_file}: {error}")
+                    else:
+                        print(f"Converted: {tg_file} -> {', '.join(outputs)}")
+                        manifest.remove_outputs(manifest.record(tg_path, tg_path, outputs))
+    finally:
+        manifest.save()  # Keeps whatever finished if the run is interrupted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every tier of MFA TextGrids to per-tier CSV folders.")
+    parser.add_argument("input_dir", nargs="?", default="noisy_and_clean_voice")
+    parser.add_argument("output_dir", nargs="?", default=".")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-f", "--format", choices=sorted(writers), default="csv",
+                        help="csv: one CSV per tier and recording; parquet: one dataset per tier (needs pyarrow)")
+    parser.add_argument("--force", action="store_true", help="re-export every file, even unchanged ones")
+    args = parser.parse_args()
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet needs pyarrow (pip install pyarrow)")
+    convert_textgrid_with_tiers_to_csv(args.input_dir, args.output_dir, args.workers, args.format, args.force)
+
+
+if __name__ == "__main__":
+    main()
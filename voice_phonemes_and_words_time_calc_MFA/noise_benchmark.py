@@ -0,0 +1,145 @@
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+from textgrid_reader import LabelTable, read_tiers
+from whisper_mfa_compare import align_tokens
+
+
+reference_name = "clean_voice"
+tier_names = ("phones", "words")
+
+
+def variant_sets(root, reference=reference_name):
+    # A variant set is a folder holding <reference>.TextGrid next to the
+    # TextGrids of its noisy/enhanced versions. `root` may be one such
+    # folder or contain many of them.
+    folders = [root] + sorted(entry.path for entry in os.scandir(root) if entry.is_dir())
+    sets = []
+    for folder in folders:
+        if os.path.exists(os.path.join(folder, reference + ".TextGrid")):
+            variants = sorted(f[:-len(".TextGrid")] for f in os.listdir(folder)
+                              if f.endswith(".TextGrid") and f != reference + ".TextGrid")
+            sets.append((folder, variants))
+    return sets
+
+
+def compare_tier(ref, var):
+    # Aligns the non-empty labels of two tiers read with one LabelTable, so
+    # label ids are directly comparable. Boundary deviations and duration
+    # ratios are taken over exactly matching labels.
+    ref_keep, var_keep = ref.nonempty(), var.nonempty()
+    ref_ids, var_ids = ref.label_ids[ref_keep], var.label_ids[var_keep]
+    ri, vi, (substitutions, deletions, insertions) = align_tokens(ref_ids, var_ids)
+    same = ref_ids[ri] == var_ids[vi]
+    ri, vi = ri[same], vi[same]
+    ref_starts, ref_ends = ref.starts[ref_keep][ri], ref.ends[ref_keep][ri]
+    var_starts, var_ends = var.starts[var_keep][vi], var.ends[var_keep][vi]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = (var_ends - var_starts) / (ref_ends - ref_starts)
+    return {
+        "reference": len(ref_ids),
+        "substitutions": int(substitutions),
+        "deletions": deletions,
+        "insertions": insertions,
+        "boundary": np.concatenate([var_starts - ref_starts, var_ends - ref_ends]),
+        "duration_ratio": ratios[np.isfinite(ratios)],
+        "speech_ratio": float(var.durations[var_keep].sum() / max(ref.durations[ref_keep].sum(), 1e-9)),
+    }
+
+
+def benchmark(sets, reference=reference_name):
+    # One result per (set, variant, tier)
+    results = []
+    for folder, variants in sets:
+        labels = LabelTable()
+        ref_tiers = read_tiers(os.path.join(folder, reference + ".TextGrid"), labels, tier_names)
+        for variant in variants:
+            var_tiers = read_tiers(os.path.join(folder, variant + ".TextGrid"), labels, tier_names)
+            for tier in tier_names:
+                if tier in ref_tiers and tier in var_tiers:
+                    result = compare_tier(ref_tiers[tier], var_tiers[tier])
+                    result.update(set=os.path.basename(os.path.normpath(folder)), variant=variant, tier=tier)
+                    results.append(result)
+    return results
+
+
+def summarize(results):
+    # Pools all sets per (variant, tier)
+    rows = []
+    for variant in sorted({r["variant"] for r in results}):
+        for tier in tier_names:
+            group = [r for r in results if r["variant"] == variant and r["tier"] == tier]
+            if not group:
+                continue
+            reference = sum(r["reference"] for r in group)
+            boundary = np.abs(np.concatenate([r["boundary"] for r in group]))
+            ratios = np.concatenate([r["duration_ratio"] for r in group])
+            rows.append({
+                "variant": variant,
+                "tier": tier,
+                "sets": len(group),
+                "reference": reference,
+                "substitution_rate": sum(r["substitutions"] for r in group) / max(reference, 1),
+                "deletion_rate": sum(r["deletions"] for r in group) / max(reference, 1),
+                "insertion_rate": sum(r["insertions"] for r in group) / max(reference, 1),
+                "boundary_mae": float(boundary.mean()) if len(boundary) else np.nan,
+                "boundary_p90": float(np.percentile(boundary, 90)) if len(boundary) else np.nan,
+                "within_20ms": float((boundary <= 0.02).mean()) if len(boundary) else np.nan,
+                "duration_ratio": float(np.median(ratios)) if len(ratios) else np.nan,
+                "speech_ratio": float(np.mean([r["speech_ratio"] for r in group])),
+            })
+    return rows
+
+
+def print_summary(rows, reference=reference_name):
+    width = max([len(row["variant"]) for row in rows] + [len("variant")]) + 2
+    print(f"Reference: {reference}. Boundary deviation is over matching labels; rates are per reference label.")
+    print(f"{'variant':<{width}}{'tier':<8}{'sets':>5}{'sub':>7}{'del':>7}{'ins':>7}"
+          f"{'MAE':>8}{'p90':>8}{'<=20ms':>8}{'dur':>7}{'speech':>8}")
+    for row in rows:
+        print(f"{row['variant']:<{width}}{row['tier']:<8}{row['sets']:>5}"
+              f"{row['substitution_rate']:>7.1%}{row['deletion_rate']:>7.1%}{row['insertion_rate']:>7.1%}"
+              f"{row['boundary_mae'] * 1000:>6.0f}ms{row['boundary_p90'] * 1000:>6.0f}ms{row['within_20ms']:>8.1%}"
+              f"{row['duration_ratio']:>7.2f}{row['speech_ratio']:>8.2f}")
+
+
+def write_summary(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: f"{v:.4f}" if isinstance(v, float) else v for k, v in row.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score noisy and enhanced MFA alignments against the clean one.")
+    parser.add_argument("input_dir", nargs="?", default="noisy_and_clean_voice",
+                        help="a variant set folder, or a folder of them")
+    parser.add_argument("-r", "--reference", default=reference_name, help="TextGrid name used as reference")
+    parser.add_argument("-o", "--output", help="also write the summary table to this CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sets = variant_sets(args.input_dir, args.reference)
+    if not sets:
+        print(f"No {args.reference}.TextGrid found in {args.input_dir} or its subfolders.")
+        return
+    results = benchmark(sets, args.reference)
+    rows = summarize(results)
+    elapsed = time.perf_counter() - start
+
+    print_summary(rows, args.reference)
+    n_variants = sum(len(variants) for _, variants in sets)
+    print(f"Compared {n_variants} variants in {len(sets)} sets in {elapsed:.2f}s "
+          f"({elapsed / max(n_variants, 1) * 1000:.1f} ms per variant).")
+    if args.output and rows:
+        write_summary(args.output, rows)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
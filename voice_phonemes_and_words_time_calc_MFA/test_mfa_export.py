@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mfa_export import convert_textgrid_with_tiers_to_csv
+
+sample_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "noisy_and_clean_voice")
+
+
+def outputs(output_dir):
+    return sorted(name for tier in ("words_time_csv", "phonemes_time_csv")
+                  for name in os.listdir(os.path.join(output_dir, tier)))
+
+
+class ConvertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.output_dir = os.path.join(self.tmp, "out")
+
+    def input_dir(self, name, textgrids):
+        path = os.path.join(self.tmp, name)
+        os.makedirs(path)
+        for textgrid in textgrids:
+            shutil.copy(os.path.join(sample_dir, textgrid), path)
+        return path
+
+    def convert(self, input_dir):
+        convert_textgrid_with_tiers_to_csv(input_dir, self.output_dir, workers=1)
+
+    def test_two_input_dirs_share_output_dir(self):
+        first = self.input_dir("first", ["clean_voice.TextGrid", "noisy_voice.TextGrid"])
+        second = self.input_dir("second", ["enhanced_free.TextGrid"])
+        self.convert(first)
+        self.convert(second)
+        self.convert(first)  # a rerun of the first folder must not remove the second folder's outputs
+        expected = ["clean_voice.csv", "enhanced_free.csv", "noisy_voice.csv"]
+        self.assertEqual(outputs(self.output_dir), sorted(expected * 2))
+
+    def test_deleted_source_removes_only_its_outputs(self):
+        first = self.input_dir("first", ["clean_voice.TextGrid", "noisy_voice.TextGrid"])
+        second = self.input_dir("second", ["enhanced_free.TextGrid"])
+        self.convert(first)
+        self.convert(second)
+        os.remove(os.path.join(first, "noisy_voice.TextGrid"))
+        self.convert(first)
+        self.assertEqual(outputs(self.output_dir), sorted(["clean_voice.csv", "enhanced_free.csv"] * 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
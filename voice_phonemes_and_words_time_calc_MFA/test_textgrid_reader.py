@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from textgrid_reader import LabelTable, read_tiers
+
+long_format = '''File type = "ooTextFile"
+Object class = "TextGrid"
+
+xmin = 0 
+xmax = 1.5 
+tiers? <exists> 
+size = 2 
+item []: 
+    item [1]:
+        class = "IntervalTier" 
+        name = "words" 
+        xmin = 0 
+        xmax = 1.5 
+        intervals: size = 3 
+        intervals [1]:
+            xmin = 0 
+            xmax = 0.42 
+            text = "" 
+        intervals [2]:
+            xmin = 0.42 
+            xmax = 0.9 
+            text = "say ""hi""" 
+        intervals [3]:
+            xmin = 0.9 
+            xmax = 1.5 
+            text = "café" 
+    item [2]:
+        class = "TextTier" 
+        name = "events" 
+        xmin = 0 
+        xmax = 1.5 
+        points: size = 1 
+        points [1]:
+            number = 1.25e0 
+            mark = "click" 
+'''
+
+# The same grid in Praat's short text format: values only, one per line
+short_format = '''File type = "ooTextFile"
+Object class = "TextGrid"
+
+0
+1.5
+<exists>
+2
+"IntervalTier"
+"words"
+0
+1.5
+3
+0
+0.42
+""
+0.42
+0.9
+"say ""hi"""
+0.9
+1.5
+"café"
+"TextTier"
+"events"
+0
+1.5
+1
+1.25e0
+"click"
+'''
+
+
+class ReadTiersTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, text, encoding):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding=encoding, newline="\n") as f:
+            f.write(text)
+        return path
+
+    def check(self, tiers):
+        self.assertEqual(list(tiers), ["words", "events"])
+        words = tiers["words"]
+        self.assertEqual(words.kind, "IntervalTier")
+        np.testing.assert_array_equal(words.starts, [0, 0.42, 0.9])
+        np.testing.assert_array_equal(words.ends, [0.42, 0.9, 1.5])
+        self.assertEqual(list(words.texts()), ["", 'say "hi"', "café"])
+        self.assertEqual(list(words.intervals()), [('say "hi"', 0.42, 0.9), ("café", 0.9, 1.5)])
+        events = tiers["events"]
+        self.assertEqual(events.kind, "TextTier")
+        np.testing.assert_array_equal(events.starts, [1.25])
+        np.testing.assert_array_equal(events.ends, events.starts)
+        self.assertEqual(list(events.texts()), ["click"])
+
+    def test_long_format(self):
+        self.check(read_tiers(self.write("long.TextGrid", long_format, "utf-8")))
+
+    def test_short_format(self):
+        self.check(read_tiers(self.write("short.TextGrid", short_format, "utf-8")))
+
+    def test_utf16(self):
+        # Praat writes UTF-16 (with a byte order mark) when a label needs it
+        self.check(read_tiers(self.write("long16.TextGrid", long_format, "utf-16")))
+        self.check(read_tiers(self.write("short16.TextGrid", short_format, "utf-16")))
+
+    def test_tier_filter_and_shared_labels(self):
+        labels = LabelTable()
+        first = read_tiers(self.write("a.TextGrid", long_format, "utf-8"), labels, tiers={"words"})
+        second = read_tiers(self.write("b.TextGrid", short_format, "utf-8"), labels)
+        self.assertEqual(list(first), ["words"])
+        np.testing.assert_array_equal(first["words"].label_ids, second["words"].label_ids)
+        self.assertEqual(len(labels), 4)  # "", 'say "hi"', "café", "click"
+
+    def test_malformed(self):
+        path = self.write("cut.TextGrid", short_format[:short_format.index('"TextTier"')], "utf-8")
+        with self.assertRaises(ValueError):
+            read_tiers(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
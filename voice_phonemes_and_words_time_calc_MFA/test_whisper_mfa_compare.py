@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from whisper_mfa_compare import align_tokens, compare, normalize
+
+
+def edit_distance(ref, hyp):
+    # Textbook Levenshtein distance, one cell at a time
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1]
+
+
+class AlignTokensTest(unittest.TestCase):
+    def test_example(self):
+        # the cat sat on mat / the cat sit on the mat: one substitution, one insertion
+        ref = np.array([0, 1, 2, 3, 4])
+        hyp = np.array([0, 1, 5, 3, 0, 4])
+        ri, hi, counts = align_tokens(ref, hyp)
+        self.assertEqual(counts, (1, 0, 1))
+        self.assertEqual(list(zip(ri.tolist(), hi.tolist())), [(0, 0), (1, 1), (2, 2), (3, 3), (4, 5)])
+
+    def test_empty(self):
+        empty = np.zeros(0, dtype=np.int64)
+        for ref, hyp, counts in ((empty, empty, (0, 0, 0)), (np.array([1, 2]), empty, (0, 2, 0)),
+                                 (empty, np.array([1, 2, 3]), (0, 0, 3))):
+            ri, hi, result = align_tokens(ref, hyp)
+            self.assertEqual(result, counts)
+            self.assertEqual(len(ri), 0)
+            self.assertEqual(len(hi), 0)
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            ref = rng.integers(0, 4, rng.integers(0, 12))
+            hyp = rng.integers(0, 4, rng.integers(0, 12))
+            ri, hi, (s, d, ins) = align_tokens(ref, hyp)
+            self.assertEqual(s + d + ins, edit_distance(ref.tolist(), hyp.tolist()))
+            self.assertEqual(s, int((ref[ri] != hyp[hi]).sum()))
+            self.assertEqual(len(ri) + d, len(ref))
+            self.assertEqual(len(hi) + ins, len(hyp))
+            self.assertTrue((np.diff(ri) > 0).all() and (np.diff(hi) > 0).all())  # in order, each word once
+
+
+class CompareTest(unittest.TestCase):
+    def test_offsets_of_matching_words(self):
+        self.assertEqual(normalize(" Don't,"), "don't")
+        mfa = {"F10_01_01": (["i", "like", "cats"], np.array([0.1, 0.4, 0.8]), np.array([0.3, 0.7, 1.2]))}
+        whisper = {
+            "F10_01_01": ([" I", " like", " dogs."], np.array([0.12, 0.38, 0.85]), np.array([0.3, 0.72, 1.1])),
+            "M11_01_01": ([" hello"], np.array([0.0]), np.array([0.5])),  # no MFA alignment: skipped
+        }
+        words, counts = compare(mfa, whisper)
+        self.assertEqual(counts["recording_id"].tolist(), ["F10_01_01"])
+        self.assertEqual(counts["substitutions"].tolist(), [1])
+        self.assertEqual(counts["speaker"].tolist(), ["F10"])
+        self.assertEqual(words["match"].tolist(), [True, True, False])
+        np.testing.assert_allclose(words["start_offset"], [0.02, -0.02, 0.05])
+        np.testing.assert_allclose(words["end_offset"], [0.0, 0.02, -0.1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import re
+
+import numpy as np
+
+
+# Praat's long and short ooTextFile formats carry the same values in the
+# same order; the long one only adds "key =" labels and "[n]" indices. So
+# both are read by keeping strings, flags and numbers. Keys, indices and
+# whitespace are consumed in runs as empty matches and dropped, which is
+# much faster than letting the scanner retry at every character.
+token_pattern = re.compile(
+    r'("(?:[^"]|"")*")'                                 # string (with quotes), "" escapes a quote
+    r'|<(exists|absent)>'                               # flag
+    r'|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'     # number
+    r'|\[[^\]\n]*\]'                                    # [n] index
+    r'|[^"<\[\d.+-]+'                                   # keys and whitespace
+)
+_skipped = ("", "", "")
+
+
+class LabelTable:
+    # Interns interval labels: each distinct text is stored once and
+    # intervals refer to it by integer id. Pass one table to several
+    # read_textgrid calls to share ids across files.
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+
+    def intern(self, name):
+        label_id = self._ids.get(name)
+        if label_id is None:
+            label_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return label_id
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, label_id):
+        return self.names[label_id]
+
+
+class Tier:
+    # One tier as columns: start/end times (float64) and label ids into a
+    # LabelTable. Point tiers (TextTier) have start == end.
+    __slots__ = ("name", "kind", "xmin", "xmax", "starts", "ends", "label_ids", "labels")
+
+    def __init__(self, name, kind, xmin, xmax, starts, ends, label_ids, labels):
+        self.name = name
+        self.kind = kind
+        self.xmin = xmin
+        self.xmax = xmax
+        self.starts = starts
+        self.ends = ends
+        self.label_ids = label_ids
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"Tier({self.name!r}, {self.kind}, {len(self)} intervals)"
+
+    @property
+    def durations(self):
+        return self.ends - self.starts
+
+    def texts(self):
+        names = np.asarray(self.labels.names, dtype=object)
+        return names[self.label_ids]
+
+    def nonempty(self):
+        # Mask of intervals with a non-blank label (MFA leaves silences empty)
+        blank = np.array([not name.strip() for name in self.labels.names], dtype=bool)
+        return ~blank[self.label_ids] if len(blank) else np.zeros(0, dtype=bool)
+
+    def intervals(self, skip_empty=True):
+        for start, end, label_id in zip(self.starts.tolist(), self.ends.tolist(), self.label_ids.tolist()):
+            text = self.labels.names[label_id].strip()
+            if text or not skip_empty:
+                yield text, start, end
+
+
+def _decode(raw):
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return raw.decode("utf-16")
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+class _Tokens:
+    # Flat (string, flag, number) token list of a file. Numbers stay text
+    # until a whole column is converted by NumPy at once.
+    def __init__(self, text):
+        self.items = [item for item in token_pattern.findall(text) if item != _skipped]
+        self.pos = 0
+
+    def _next(self):
+        item = self.items[self.pos]
+        self.pos += 1
+        return item
+
+    def string(self):
+        return _unquote(self._next()[0])
+
+    def number(self):
+        return float(self._next()[2])
+
+    def flag(self):
+        return self._next()[1] == "exists"
+
+    def columns(self, n_rows, n_cols):
+        items = self.items[self.pos:self.pos + n_rows * n_cols]
+        if len(items) < n_rows * n_cols:
+            raise ValueError("unexpected end of file")
+        self.pos += n_rows * n_cols
+        return [items[i::n_cols] for i in range(n_cols)]
+
+
+def _unquote(string):
+    return string[1:-1].replace('""', '"')
+
+
+def _times(column):
+    return np.array([number for _, _, number in column]).astype(np.float64)
+
+
+def _label_ids(column, labels):
+    return np.array([labels.intern(_unquote(string)) for string, _, _ in column], dtype=np.int32)
+
+
+def read_textgrid(path, labels=None, tiers=None):
+    # Yields the tiers of a TextGrid file (long or short text format) one at
+    # a time. Only tiers named in `tiers` are built when it is given.
+    with open(path, "rb") as f:
+        text = _decode(f.read())
+    if labels is None:
+        labels = LabelTable()
+
+    tokens = _Tokens(text)
+    try:
+        if tokens.string() != "ooTextFile" or tokens.string() != "TextGrid":
+            raise ValueError("not a TextGrid text file")
+        tokens.number(), tokens.number()  # xmin, xmax of the whole grid
+        if not tokens.flag():  # tiers? <absent>
+            return
+        n_tiers = int(tokens.number())
+
+        for _ in range(n_tiers):
+            kind, name = tokens.string(), tokens.string()
+            xmin, xmax = tokens.number(), tokens.number()
+            n = int(tokens.number())
+            if kind == "IntervalTier":
+                start_col, end_col, text_col = tokens.columns(n, 3)
+            elif kind == "TextTier":
+                start_col, text_col = tokens.columns(n, 2)
+                end_col = start_col
+            else:
+                raise ValueError(f"unknown tier class {kind!r}")
+            if tiers is None or name in tiers:
+                starts = _times(start_col)
+                ends = starts.copy() if end_col is start_col else _times(end_col)
+                yield Tier(name, kind, xmin, xmax, starts, ends, _label_ids(text_col, labels), labels)
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"{path}: malformed TextGrid ({e})") from None
+
+
+def read_tiers(path, labels=None, tiers=None):
+    # The whole file at once, as {tier name: Tier}
+    return {tier.name: tier for tier in read_textgrid(path, labels, tiers)}
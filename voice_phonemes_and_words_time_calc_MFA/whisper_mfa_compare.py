@@ -0,0 +1,200 @@
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from mfa_export import speaker_of
+
+
+word_pattern = re.compile(r"[^\w']+")  # Whisper keeps punctuation and case, MFA does not
+
+
+def normalize(word):
+    return word_pattern.sub("", word.lower())
+
+
+def align_tokens(ref, hyp):
+    # Levenshtein alignment of two integer token arrays. Each DP row is
+    # computed at once: substitutions and deletions come from the previous
+    # row, and the chain of insertions along the row is a running minimum
+    # of (cost - j) + j. Returns the aligned (ref, hyp) index pairs (matches
+    # and substitutions) and the substitution/deletion/insertion counts.
+    n, m = len(ref), len(hyp)
+    cols = np.arange(m + 1, dtype=np.int32)
+    D = np.empty((n + 1, m + 1), dtype=np.int32)
+    D[0] = cols
+    for i in range(1, n + 1):
+        cost = np.empty(m + 1, dtype=np.int32)
+        cost[0] = i
+        cost[1:] = np.minimum(D[i - 1, :-1] + (hyp != ref[i - 1]), D[i - 1, 1:] + 1)
+        D[i] = np.minimum.accumulate(cost - cols) + cols
+
+    pairs = []
+    substitutions = deletions = insertions = 0
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and D[i, j] == D[i - 1, j - 1] + (ref[i - 1] != hyp[j - 1]):
+            i, j = i - 1, j - 1
+            pairs.append((i, j))
+            substitutions += ref[i] != hyp[j]
+        elif i > 0 and D[i, j] == D[i - 1, j] + 1:
+            i -= 1
+            deletions += 1
+        else:
+            j -= 1
+            insertions += 1
+    pairs = np.array(pairs[::-1], dtype=np.int64).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1], (int(substitutions), deletions, insertions)
+
+
+def load_mfa_words(words_dir):
+    # {recording_id: (words, starts, ends)} from a words_time_csv folder
+    recordings = {}
+    for name in sorted(os.listdir(words_dir)):
+        if not name.endswith(".csv"):
+            continue
+        with open(os.path.join(words_dir, name), newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))[1:]
+        recordings[os.path.splitext(name)[0]] = (
+            [row[0] for row in rows],
+            np.array([row[1] for row in rows], dtype=np.float64),
+            np.array([row[2] for row in rows], dtype=np.float64),
+        )
+    return recordings
+
+
+def compare(mfa, whisper):
+    # Aligns every recording present in both sources. Returns per-word
+    # columns (one row per aligned word pair) and per-recording error counts.
+    common = sorted(set(mfa) & set(whisper))
+    vocabulary = {}
+
+    def tokens(words):
+        return np.array([vocabulary.setdefault(normalize(w), len(vocabulary)) for w in words], dtype=np.int64)
+
+    words = {name: [] for name in ("recording_id", "word", "mfa_index", "whisper_index", "match",
+                                   "mfa_start", "mfa_end", "whisper_start", "whisper_end")}
+    counts = {name: [] for name in ("recording_id", "reference_words", "substitutions", "deletions", "insertions")}
+    for recording_id in common:
+        ref_words, ref_starts, ref_ends = mfa[recording_id]
+        hyp_words, hyp_starts, hyp_ends = whisper[recording_id]
+        ref, hyp = tokens(ref_words), tokens(hyp_words)
+        ri, hi, (s, d, ins) = align_tokens(ref, hyp)
+
+        words["recording_id"].append(np.full(len(ri), recording_id, dtype=object))
+        words["word"].append(np.array(ref_words, dtype=object)[ri])
+        words["mfa_index"].append(ri)
+        words["whisper_index"].append(hi)
+        words["match"].append(ref[ri] == hyp[hi])
+        words["mfa_start"].append(ref_starts[ri])
+        words["mfa_end"].append(ref_ends[ri])
+        words["whisper_start"].append(hyp_starts[hi])
+        words["whisper_end"].append(hyp_ends[hi])
+        for name, value in zip(counts, (recording_id, len(ref), s, d, ins)):
+            counts[name].append(value)
+
+    words = {name: np.concatenate(parts) if parts else np.zeros(0) for name, parts in words.items()}
+    words["start_offset"] = words["whisper_start"] - words["mfa_start"]
+    words["end_offset"] = words["whisper_end"] - words["mfa_end"]
+    words["speaker"] = np.array([speaker_of(r) for r in words["recording_id"]], dtype=object)
+    counts = {name: np.array(values) for name, values in counts.items()}
+    counts["speaker"] = np.array([speaker_of(r) for r in counts["recording_id"].tolist()], dtype=object)
+    return words, counts
+
+
+def offset_stats(offsets):
+    # Boundary error summary in seconds; offsets are whisper - mfa
+    if not len(offsets):
+        return {"n": 0, "mean": np.nan, "median": np.nan, "mae": np.nan, "p90": np.nan, "within_50ms": np.nan}
+    absolute = np.abs(offsets)
+    return {
+        "n": len(offsets),
+        "mean": float(offsets.mean()),
+        "median": float(np.median(offsets)),
+        "mae": float(absolute.mean()),
+        "p90": float(np.percentile(absolute, 90)),
+        "within_50ms": float((absolute <= 0.05).mean()),
+    }
+
+
+def summarize(words, counts):
+    # One row per speaker plus an "ALL" row. Only exactly matching words
+    # contribute to the timing statistics.
+    rows = []
+    speakers = sorted(set(counts["speaker"].tolist()))
+    for speaker in speakers + ["ALL"]:
+        word_rows = words["match"].astype(bool)
+        count_rows = np.ones(len(counts["speaker"]), dtype=bool)
+        if speaker != "ALL":
+            word_rows &= words["speaker"] == speaker
+            count_rows = counts["speaker"] == speaker
+        errors = sum(counts[name][count_rows].sum() for name in ("substitutions", "deletions", "insertions"))
+        reference = counts["reference_words"][count_rows].sum()
+        rows.append({
+            "speaker": speaker,
+            "recordings": int(count_rows.sum()),
+            "wer": float(errors / reference) if reference else np.nan,
+            "start": offset_stats(words["start_offset"][word_rows]),
+            "end": offset_stats(words["end_offset"][word_rows]),
+        })
+    return rows
+
+
+def print_summary(rows):
+    width = max(len(row["speaker"]) for row in rows) + 2
+    print(f"{'speaker':<{width}}{'recs':>6}{'WER':>7}{'words':>7}"
+          f"{'start mean':>12}{'start MAE':>11}{'end mean':>10}{'end MAE':>9}{'start<=50ms':>13}")
+    for row in rows:
+        start, end = row["start"], row["end"]
+        print(f"{row['speaker']:<{width}}{row['recordings']:>6}{row['wer']:>7.1%}{start['n']:>7}"
+              f"{start['mean'] * 1000:>10.0f}ms{start['mae'] * 1000:>9.0f}ms"
+              f"{end['mean'] * 1000:>8.0f}ms{end['mae'] * 1000:>7.0f}ms{start['within_50ms']:>13.1%}")
+
+
+def write_words(path, words):
+    names = ("recording_id", "speaker", "word", "mfa_index", "whisper_index", "match",
+             "mfa_start", "mfa_end", "whisper_start", "whisper_end", "start_offset", "end_offset")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for row in zip(*(words[name].tolist() for name in names)):
+            writer.writerow([f"{value:.3f}" if isinstance(value, float) else value for value in row])
+
+
+def main():
+    # The Whisper table is read with the recorder's corpus_table module, so
+    # voice_record_and_analyze_gui must be importable (the script entry
+    # point below adds it)
+    from corpus_table import group_words, read_table
+
+    parser = argparse.ArgumentParser(description="Compare Whisper word timestamps with MFA word alignments.")
+    parser.add_argument("whisper_table", help="output of Whisper_Batch_Corpus.py (.parquet or .npz)")
+    parser.add_argument("mfa_words_dir", nargs="?", default="words_time_csv")
+    parser.add_argument("-o", "--output", help="also write the aligned word pairs to this CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    mfa = load_mfa_words(args.mfa_words_dir)
+    whisper = group_words(read_table(args.whisper_table, columns=["recording_id", "word", "start", "end"]))
+    loaded = time.perf_counter()
+    words, counts = compare(mfa, whisper)
+    done = time.perf_counter()
+
+    if not len(counts["recording_id"]):
+        print(f"No recordings in common ({len(mfa)} MFA, {len(whisper)} Whisper).")
+        return
+    print_summary(summarize(words, counts))
+    print(f"Aligned {len(counts['recording_id'])} recordings, {len(words['word'])} words in {done - loaded:.2f}s "
+          f"(loading {loaded - start:.2f}s). Offsets are Whisper minus MFA.")
+    if args.output:
+        write_words(args.output, words)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "voice_record_and_analyze_gui"))
+    main()
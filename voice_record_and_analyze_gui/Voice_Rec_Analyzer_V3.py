@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog
 from PIL import Image, ImageTk
@@ -7,7 +8,16 @@ import wave
 import time
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import whisper
+from audio_buffer import AudioBuffer
+import whisper_models
+import transcription
+from recording_analysis import RecordingAnalysis
+from analysis_jobs import AnalysisQueue
+from span_overlay import SpanHighlighter
+from waveform_pyramid import WaveformPyramid, WaveformView
+from live_view import LiveWaveform, LiveSpectrogram
+from streaming_transcriber import StreamingTranscriber
+from interval_index import IntervalIndex
 
 
 class AudioRecorderApp:
@@ -19,10 +29,24 @@ class AudioRecorderApp:
         self.fs = 16000  # Sampling frequency
         self.recording = False
         self.paused = False
-        self.audio_data = np.array([])  # Initialize as an empty array
+        self.audio_data = np.array([], dtype=np.float32)  # Initialize as an empty array
+        self.recording_analysis = None  # Spectra of audio_data, shared by the plots that need them
+        self.audio_buffer = AudioBuffer(block_size=self.fs * 30)  # Capture buffer filled by audio_callback
+        self.input_level = 0.0  # Latest block volume, drawn by update_progress_bar
+        self.live_seconds = 10  # Length of the scrolling plots shown while recording
+        self.live_panels = []
+        self.live_position = 0  # Samples already handed to the live plots
         self.start_time = None
         self.elapsed_time = 0
         self.word_timestamps = []  # Store word timestamps
+        self.word_index = None  # IntervalIndex over word_timestamps, built on first click
+        self.model_name = "medium"  # Whisper model used for transcription
+        self.trim_silence = True  # Only transcribe the speech found by vad.py
+        self.streaming = tk.BooleanVar(value=False)  # Transcribe while recording
+        self.streamer = None
+        # Load the Whisper model in the background while the first take is
+        # recorded; VOICE_ANALYSIS_PRELOAD=0 waits for the first transcription
+        self.preload_model = os.environ.get("VOICE_ANALYSIS_PRELOAD", "1") != "0"
 
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -64,9 +88,18 @@ class AudioRecorderApp:
         self.progress_bar = ttk.Progressbar(self.record_frame, orient="horizontal", length=200, mode="determinate")
         self.progress_bar.pack(pady=10)
 
+        self.xrun_label = tk.Label(self.record_frame, text="Dropouts: 0", font=("Arial", 10))
+        self.xrun_label.pack(pady=5)
+
+        self.status_label = tk.Label(self.record_frame, text="Status: Idle", font=("Arial", 10))
+        self.status_label.pack(pady=5)
+
         self.save_audio_button = tk.Button(self.record_frame, text="Save Audio", command=self.save_audio, state=tk.DISABLED, font=("Arial", 12), width=20, height=1)
         self.save_audio_button.pack(pady=10)
 
+        self.streaming_check = tk.Checkbutton(self.record_frame, text="Live Transcript", variable=self.streaming, font=("Arial", 10))
+        self.streaming_check.pack(pady=5)
+
         # Transcript Panel
         self.transcript_frame = tk.Frame(self.left_main_frame, relief=tk.GROOVE, borderwidth=2)
         self.transcript_frame.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -106,12 +139,19 @@ class AudioRecorderApp:
         self.reset_waveform_panel()
         self.reset_spectrogram_panel()
 
+        # Waveform, spectrogram and transcript are computed off the Tk thread
+        self.analysis = AnalysisQueue(self.root, max_workers=2, on_status=self.update_status_label)
+        self.analysis_job = None
+
     def reset_waveform_panel(self):        
         for widget in self.waveform_panel.winfo_children():
             widget.destroy()
 
         self.waveform_fig, self.waveform_ax = plt.subplots(figsize=(5, 2.5))
         self.waveform_canvas_agg = FigureCanvasTkAgg(self.waveform_fig, master=self.waveform_panel)
+        self.waveform_highlight = None
+        self.waveform_view = None
+        self.waveform_canvas_agg.mpl_connect("button_press_event", self.on_plot_click)
         self.waveform_canvas_agg.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         toolbar = NavigationToolbar2Tk(self.waveform_canvas_agg, self.waveform_panel)
@@ -124,6 +164,8 @@ class AudioRecorderApp:
 
         self.spectrogram_fig, self.spectrogram_ax = plt.subplots(figsize=(5, 2.5))
         self.spectrogram_canvas_agg = FigureCanvasTkAgg(self.spectrogram_fig, master=self.spectrogram_panel)
+        self.spectrogram_highlight = None
+        self.spectrogram_canvas_agg.mpl_connect("button_press_event", self.on_plot_click)
         self.spectrogram_canvas_agg.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         toolbar = NavigationToolbar2Tk(self.spectrogram_canvas_agg, self.spectrogram_panel)
@@ -131,9 +173,13 @@ class AudioRecorderApp:
         toolbar.pack(side=tk.BOTTOM, fill=tk.X)
 
     def show_waveform(self):        
+        audio = self.audio_data
+        self.analysis.submit(self.analysis_job, "Waveform", lambda job: WaveformPyramid(audio, self.fs), self.draw_waveform)
+
+    def draw_waveform(self, pyramid):
         self.waveform_ax.clear()
-        time = np.linspace(0, len(self.audio_data) / self.fs, len(self.audio_data))
-        self.waveform_ax.plot(time, self.audio_data, label="Waveform")
+        self.waveform_view = WaveformView(self.waveform_ax, pyramid, label="Waveform")
+        self.waveform_highlight = SpanHighlighter(self.waveform_ax)
         self.waveform_ax.set_title("Waveform")
         self.waveform_ax.set_xlabel("Time [s]")
         self.waveform_ax.set_ylabel("Amplitude")
@@ -141,10 +187,15 @@ class AudioRecorderApp:
         self.waveform_canvas_agg.draw()
 
     def show_spectrogram(self):        
+        analysis = self.recording_analysis
+        self.analysis.submit(self.analysis_job, "Spectrogram", lambda job: analysis.spectrogram_image(), self.draw_spectrogram)
+
+    def draw_spectrogram(self, image):
+        Z, extent = image
         self.spectrogram_ax.clear()
-        Pxx, freqs, bins, im = self.spectrogram_ax.specgram(
-            self.audio_data, Fs=self.fs, NFFT=2048, noverlap=1024, cmap='viridis'
-        )
+        im = self.spectrogram_ax.imshow(Z, cmap='viridis', extent=extent, origin='upper')
+        self.spectrogram_ax.axis('auto')
+        self.spectrogram_highlight = SpanHighlighter(self.spectrogram_ax)
         self.spectrogram_ax.set_title("Spectrogram")
         self.spectrogram_ax.set_xlabel("Time [s]")
         self.spectrogram_ax.set_ylabel("Frequency [Hz]")
@@ -162,22 +213,28 @@ class AudioRecorderApp:
             self.highlight_spectrogram(start, end)
             self.play_segment(start, end)
 
+    def on_plot_click(self, event):
+        # Clicking a plot selects the word spoken at that time
+        toolbar = event.canvas.toolbar
+        if event.button != 1 or event.xdata is None or (toolbar is not None and toolbar.mode):
+            return
+        if self.word_index is None:
+            self.word_index = IntervalIndex.from_words(self.word_timestamps)
+        index = self.word_index.at(event.xdata)
+        if index < 0:
+            return
+        self.word_listbox.selection_clear(0, tk.END)
+        self.word_listbox.selection_set(index)
+        self.word_listbox.see(index)
+        self.on_word_select(None)
+
     def highlight_waveform(self, start, end):        
-        self.waveform_ax.clear()
-        time = np.linspace(0, len(self.audio_data) / self.fs, len(self.audio_data))
-        self.waveform_ax.plot(time, self.audio_data, label="Waveform")
-        self.waveform_ax.axvspan(start, end, color="red", alpha=0.3, label="Selected Word")
-        self.waveform_ax.legend()
-        self.waveform_canvas_agg.draw()
+        if self.waveform_highlight is not None:
+            self.waveform_highlight.show(start, end)
 
     def highlight_spectrogram(self, start, end):        
-        self.spectrogram_ax.clear()
-        Pxx, freqs, bins, im = self.spectrogram_ax.specgram(
-            self.audio_data, Fs=self.fs, NFFT=2048, noverlap=1024, cmap='viridis'
-        )
-        self.spectrogram_ax.axvspan(start, end, color="red", alpha=0.3, label="Selected Word")
-        self.spectrogram_ax.legend()
-        self.spectrogram_canvas_agg.draw()
+        if self.spectrogram_highlight is not None:
+            self.spectrogram_highlight.show(start, end)
 
     def play_segment(self, start, end):        
         start_idx = int(start * self.fs)
@@ -195,44 +252,94 @@ class AudioRecorderApp:
                 wf.writeframes((self.audio_data * 32767).astype(np.int16).tobytes())
 
     def generate_transcript(self):        
-        try:            
-            temp_file = "temp_audio.wav"
-            with wave.open(temp_file, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(self.fs)
-                wf.writeframes((self.audio_data * 32767).astype(np.int16).tobytes())
-            
-            model = whisper.load_model("medium")
-            result = model.transcribe(temp_file, word_timestamps=True)
-            
-            transcript = result["text"]
-            self.transcript_text.delete(1.0, tk.END)
-            self.transcript_text.insert(tk.END, transcript)
-            
-            self.word_listbox.delete(0, tk.END)
-            self.word_timestamps = []
-            for segment in result["segments"]:
-                for word in segment["words"]:
-                    self.word_timestamps.append(word)
-                    self.word_listbox.insert(tk.END, word["word"])
-            
-            self.word_count_label.config(text=f"Word Count: {len(self.word_timestamps)}")
+        audio = self.audio_data
+        self.analysis.submit(
+            self.analysis_job, "Transcribing",
+            lambda job: transcription.transcribe(audio, self.model_name, fs=self.fs, vad=self.trim_silence,
+                                                 is_cancelled=lambda: job.cancelled),
+            self.show_transcript, self.show_transcript_error,
+        )
 
-        except Exception as e:
-            self.transcript_text.delete(1.0, tk.END)
-            self.transcript_text.insert(tk.END, f"Error: {e}")
-            self.word_count_label.config(text="Word Count: 0")
+    def show_transcript(self, result):
+        transcript = result["text"]
+        self.transcript_text.delete(1.0, tk.END)
+        self.transcript_text.insert(tk.END, transcript)
+        
+        self.word_listbox.delete(0, tk.END)
+        self.word_timestamps = []
+        self.word_index = None
+        for segment in result["segments"]:
+            for word in segment["words"]:
+                self.word_timestamps.append(word)
+                self.word_listbox.insert(tk.END, word["word"])
+        
+        self.word_count_label.config(text=f"Word Count: {len(self.word_timestamps)}")
+
+    def add_transcript_words(self, words):
+        self.word_index = None
+        for word in words:
+            self.word_timestamps.append(word)
+            self.word_listbox.insert(tk.END, word["word"])
+            self.transcript_text.insert(tk.END, word["word"])
+        self.word_count_label.config(text=f"Word Count: {len(self.word_timestamps)}")
+
+    def update_streaming(self):
+        streamer = self.streamer
+        if streamer is None or streamer.busy or not streamer.window_ready():
+            return
+        streamer.busy = True
+
+        def done(words):
+            streamer.busy = False
+            self.add_transcript_words(words)
+
+        def failed(e):
+            streamer.busy = False
+            print(f"Live transcription failed: {e}")
+
+        self.analysis.submit(self.analysis_job, "Live transcript",
+                             lambda job: streamer.transcribe_next(is_cancelled=lambda: job.cancelled), done, failed)
+
+    def finish_streaming(self):
+        streamer = self.streamer
+        self.streamer = None
+        self.analysis.submit(self.analysis_job, "Transcribing", lambda job: streamer.finish(is_cancelled=lambda: job.cancelled),
+                             self.add_transcript_words, self.show_transcript_error)
+
+    def show_transcript_error(self, e):
+        self.transcript_text.delete(1.0, tk.END)
+        self.transcript_text.insert(tk.END, f"Error: {e}")
+        self.word_count_label.config(text="Word Count: 0")
+
+    def clear_transcript(self):
+        self.transcript_text.delete(1.0, tk.END)
+        self.word_listbox.delete(0, tk.END)
+        self.word_timestamps = []
+        self.word_index = None
+        self.word_count_label.config(text="Word Count: 0")
 
     def start_recording(self):        
+        self.analysis_job = self.analysis.new_job()  # Results of the previous take are no longer wanted
+        if self.preload_model:
+            whisper_models.warm_up(self.model_name)
+            self.preload_model = False  # Once is enough: the model stays resident
+        self.clear_transcript()
         self.reset_waveform_panel()
         self.reset_spectrogram_panel()
+        self.start_live_view()
         self.recording = True
         self.paused = False
-        self.audio_data = np.array([])  # Clear previous data
+        self.audio_buffer = AudioBuffer(block_size=self.fs * 30)  # Fresh buffer: jobs of the previous take may still read the old one
+        self.audio_data = np.array([], dtype=np.float32)
+        self.recording_analysis = None
+        self.xrun_label.config(text="Dropouts: 0")
+        self.streamer = StreamingTranscriber(self.audio_buffer, self.fs, self.model_name,
+                                             vad=self.trim_silence) if self.streaming.get() else None
+        self.streaming_check.config(state=tk.DISABLED)
         self.start_time = time.time() - self.elapsed_time
         self.update_timer()
         self.update_progress_bar()
+        self.update_live_view()
         self.record_button.config(state=tk.DISABLED)
         self.pause_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.NORMAL)
@@ -245,24 +352,28 @@ class AudioRecorderApp:
             self.recording = False
             self.stream.stop()
             self.stream.close()
+            self.stop_live_view()
             self.elapsed_time = 0
             self.record_button.config(state=tk.NORMAL)
             self.pause_button.config(state=tk.DISABLED, text="Pause")
             self.stop_button.config(state=tk.DISABLED)
             self.save_audio_button.config(state=tk.NORMAL)
+            self.streaming_check.config(state=tk.NORMAL)
+            self.audio_data = self.audio_buffer.view()
+            self.recording_analysis = RecordingAnalysis(self.audio_data, self.fs)
+            self.update_xrun_label()
             
             self.show_waveform()
             self.show_spectrogram()
-            self.generate_transcript()
+            if self.streamer is not None:
+                self.finish_streaming()  # Only the audio after the last window is left
+            else:
+                self.generate_transcript()
 
     def audio_callback(self, indata, frames, time, status):        
-        if self.recording and not self.paused:
-            if self.audio_data.size == 0:
-                self.audio_data = indata[:, 0]
-            else:
-                self.audio_data = np.concatenate((self.audio_data, indata[:, 0]))
-            volume = np.linalg.norm(indata)  
-            self.progress_bar["value"] = min(volume * 100, 100)
+        level = self.audio_buffer.capture(indata, status, self.recording and not self.paused)
+        if level is not None:
+            self.input_level = level
 
     def pause_recording(self):        
         if self.recording and not self.paused:
@@ -285,9 +396,46 @@ class AudioRecorderApp:
 
     def update_progress_bar(self):        
         if self.recording:
+            self.progress_bar["value"] = min(self.input_level * 100, 100)
+            self.update_xrun_label()
             self.root.after(100, self.update_progress_bar)
 
+    def start_live_view(self):
+        self.live_panels = [
+            LiveWaveform(self.waveform_ax, self.fs, seconds=self.live_seconds),
+            LiveSpectrogram(self.spectrogram_ax, self.fs, seconds=self.live_seconds),
+        ]
+        self.live_position = 0
+        self.waveform_canvas_agg.draw()
+        self.spectrogram_canvas_agg.draw()
+
+    def update_live_view(self):
+        if self.recording:
+            if not self.paused:
+                # Only the newest live_seconds matter, so a slow tick never
+                # has to catch up on more than one screen of audio
+                start = max(self.live_position, len(self.audio_buffer) - self.fs * self.live_seconds)
+                samples = self.audio_buffer.read(start)
+                self.live_position = start + len(samples)
+                for panel in self.live_panels:
+                    panel.update(samples)
+                self.update_streaming()
+            self.root.after(50, self.update_live_view)
+
+    def stop_live_view(self):
+        for panel in self.live_panels:
+            panel.disconnect()
+        self.live_panels = []
+
+    def update_xrun_label(self):
+        buffer = self.audio_buffer
+        self.xrun_label.config(text=f"Dropouts: {buffer.xruns}", fg="red" if buffer.xruns else "black")
+
+    def update_status_label(self, pending):
+        self.status_label.config(text=f"Status: {', '.join(pending)}..." if pending else "Status: Idle")
+
     def on_closing(self):        
+        self.analysis.shutdown()
         if self.recording:
             self.stream.stop()
             self.stream.close()
@@ -0,0 +1,26 @@
+import os
+import sys
+import matplotlib.pyplot as plt
+from corpus_table import corpus_dir
+from wav_io import read_wav
+from waveform_pyramid import WaveformPyramid, WaveformView
+
+
+def show_recording(path):
+    wav = read_wav(path)
+    if wav is None:
+        print(f"Not a 16-bit PCM WAV file: {path}")
+        return
+    audio, fs = wav
+
+    fig, ax = plt.subplots(figsize=(10, 3))
+    view = WaveformView(ax, WaveformPyramid(audio, fs), label="Waveform")
+    ax.set_title(os.path.basename(path))
+    ax.set_xlabel("Time [s]")
+    ax.set_ylabel("Amplitude")
+    ax.legend(loc="upper right")
+    plt.show()
+
+
+if __name__ == "__main__":
+    show_recording(sys.argv[1] if len(sys.argv) > 1 else os.path.join(corpus_dir, "F10_01_01.wav"))
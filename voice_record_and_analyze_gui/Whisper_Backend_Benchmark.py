@@ -0,0 +1,97 @@
+import argparse
+import difflib
+import os
+import re
+import time
+
+import numpy as np
+
+import transcription
+from corpus_reader import CorpusReader, corpus_dir
+from transcription_backends import backends
+from whisper_models import get_model
+
+
+word_pattern = re.compile(r"[^\w']+")
+
+
+def words_of(result):
+    words = [w for segment in result["segments"] for w in segment.get("words", [])]
+    return ([word_pattern.sub("", w["word"].lower()) for w in words],
+            np.array([w["start"] for w in words], dtype=np.float64),
+            np.array([w["end"] for w in words], dtype=np.float64))
+
+
+def timing_drift(reference, candidate):
+    # Start/end differences (candidate - reference) of the words both
+    # transcripts agree on, and the share of reference words matched
+    ref_words, ref_starts, ref_ends = words_of(reference)
+    words, starts, ends = words_of(candidate)
+    matcher = difflib.SequenceMatcher(a=ref_words, b=words, autojunk=False)
+    ri, ci = [], []
+    for block in matcher.get_matching_blocks():
+        ri += range(block.a, block.a + block.size)
+        ci += range(block.b, block.b + block.size)
+    return starts[ci] - ref_starts[ri], ends[ci] - ref_ends[ri], len(ri), len(ref_words)
+
+
+def ms(values, percentile=None):
+    if not len(values):
+        return "-"
+    value = np.percentile(values, percentile) if percentile else values.mean()
+    return f"{value * 1000:.0f}ms"
+
+
+def run(backend, recording_ids, reader, model_name, device):
+    get_model(model_name, device, backend)  # Loading is not part of the timing
+    results, elapsed = [], 0.0
+    for recording_id in recording_ids:
+        audio = reader.segment(recording_id)
+        start = time.perf_counter()
+        results.append(transcription.transcribe(audio, model_name, device=device, backend=backend, cache=False))
+        elapsed += time.perf_counter() - start
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcription backends for speed and word timing drift.")
+    parser.add_argument("input_dir", nargs="?", default=corpus_dir)
+    parser.add_argument("-m", "--model", default="medium")
+    parser.add_argument("-b", "--backends", nargs="+", default=["whisper-int8"], choices=list(backends),
+                        help="backends to compare against the fp32 whisper reference")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="number of recordings")
+    parser.add_argument("-t", "--threads", type=int, default=0, help="CPU threads (default: all cores)")
+    args = parser.parse_args()
+
+    import torch
+
+    torch.set_num_threads(args.threads or os.cpu_count() or 1)
+    device = "cpu"
+    reader = CorpusReader(args.input_dir)
+    recording_ids = reader.recording_ids()[:args.limit]
+    audio_seconds = sum(reader.duration(r) for r in recording_ids)
+    print(f"{len(recording_ids)} recordings, {audio_seconds:.0f}s of audio, model {args.model}, "
+          f"{torch.get_num_threads()} threads")
+
+    reference, reference_time = run("whisper", recording_ids, reader, args.model, device)
+    print(f"{'backend':<16}{'RTF':>7}{'speedup':>9}{'matched':>9}{'start MAE':>11}{'end MAE':>9}{'p90':>8}")
+    print(f"{'whisper':<16}{reference_time / audio_seconds:>7.3f}{1.0:>8.2f}x{'':>9}{'':>11}{'':>9}{'':>8}")
+    for name in args.backends:
+        if name == "whisper":
+            continue
+        try:
+            results, elapsed = run(name, recording_ids, reader, args.model, device)
+        except (RuntimeError, ValueError) as e:
+            print(f"{name:<16}skipped: {e}")
+            continue
+        drifts = [timing_drift(ref, res) for ref, res in zip(reference, results)]
+        starts = np.concatenate([d[0] for d in drifts])
+        ends = np.concatenate([d[1] for d in drifts])
+        matched = sum(d[2] for d in drifts) / max(sum(d[3] for d in drifts), 1)
+        both = np.abs(np.concatenate([starts, ends]))
+        print(f"{name:<16}{elapsed / audio_seconds:>7.3f}{reference_time / elapsed:>8.2f}x{matched:>9.1%}"
+              f"{ms(np.abs(starts)):>11}{ms(np.abs(ends)):>9}{ms(both, 90):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+from corpus_table import build_table, corpus_dir, write_table
+
+
+# Set in each worker process by init_worker
+worker_options = {}
+
+
+def init_worker(model_name, device, threads, vad=False, backend=None, spill=False):
+    import torch
+    from result_cache import ArrayCache
+    from whisper_models import get_model
+
+    if threads:
+        torch.set_num_threads(threads)
+    get_model(model_name, device, backend)  # Load once; stays resident for every file of this worker
+    worker_options.update(model_name=model_name, device=device, vad=vad, backend=backend,
+                          feature_cache=ArrayCache() if spill else None)
+
+
+def word_columns(recording_id, duration, elapsed, result):
+    words = [word for segment in result["segments"] for word in segment.get("words", [])]
+    return {
+        "recording_id": recording_id,
+        "duration": duration,
+        "elapsed": elapsed,
+        "word": [w["word"].strip() for w in words],
+        "start": [w["start"] for w in words],
+        "end": [w["end"] for w in words],
+        "probability": [w.get("probability", np.nan) for w in words],
+    }
+
+
+def load_file(path):
+    import transcription
+
+    audio = transcription.load_pcm(path)
+    if audio is None:
+        audio = transcription.load_audio(path)
+    return os.path.splitext(os.path.basename(path))[0], audio
+
+
+def transcribe_file(path):
+    import transcription
+
+    start = time.perf_counter()
+    recording_id, audio = load_file(path)
+    # Consults the content-hash cache first, so unchanged files are skipped on reruns
+    result = transcription.transcribe(audio, worker_options["model_name"], device=worker_options["device"],
+                                      vad=worker_options["vad"], backend=worker_options["backend"])
+    return word_columns(recording_id, len(audio) / transcription.SAMPLE_RATE, time.perf_counter() - start, result)
+
+
+def transcribe_batch(paths):
+    # One batch of files through batched encoder/decoder calls. The batch's
+    # time is shared out over its files in proportion to their duration.
+    import batch_transcription
+    import transcription
+    from recording_analysis import RecordingAnalysis
+
+    start = time.perf_counter()
+    loaded = [load_file(path) for path in paths]
+    results = batch_transcription.transcribe_batch(
+        [RecordingAnalysis(audio, cache=worker_options["feature_cache"]) for _, audio in loaded], worker_options["model_name"], device=worker_options["device"],
+        batch_size=len(paths), vad=worker_options["vad"], backend=worker_options["backend"])
+    elapsed = time.perf_counter() - start
+    durations = [len(audio) / transcription.SAMPLE_RATE for _, audio in loaded]
+    total = sum(durations) or 1.0
+    return [word_columns(recording_id, duration, elapsed * duration / total, result)
+            for (recording_id, _), duration, result in zip(loaded, durations, results)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe every WAV of a corpus directory with Whisper word timestamps.")
+    parser.add_argument("input_dir", nargs="?", default=corpus_dir)
+    parser.add_argument("-o", "--output", default="whisper_words_corpus.parquet", help=".parquet (needs pyarrow) or .npz")
+    parser.add_argument("-m", "--model", default="medium")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="worker processes, each with its own model")
+    parser.add_argument("-t", "--threads", type=int, default=0, help="CPU threads per worker (default: cores / workers)")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--limit", type=int, default=0, help="only process the first N files")
+    parser.add_argument("--vad", action="store_true", help="only transcribe detected speech (skips silences)")
+    parser.add_argument("-b", "--batch-size", type=int, default=1,
+                        help="clips per batched Whisper call (clips over 30s are still done one by one)")
+    parser.add_argument("--spill", action="store_true",
+                        help="with --batch-size, keep the spectra and log-mels in the on-disk feature cache")
+    parser.add_argument("--backend", help="whisper, whisper-int8 or faster-whisper (default: $VOICE_ANALYSIS_BACKEND or whisper)")
+    args = parser.parse_args()
+    if args.output.endswith(".parquet"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("a .parquet output needs pyarrow (pip install pyarrow); use -o words.npz without it")
+
+    files = sorted(os.path.join(args.input_dir, f) for f in os.listdir(args.input_dir) if f.lower().endswith(".wav"))
+    if args.limit:
+        files = files[:args.limit]
+    if not files:
+        print("No WAV files found in the input directory.")
+        return
+
+    threads = args.threads or max((os.cpu_count() or 1) // args.workers, 1)
+    print(f"Transcribing {len(files)} files with {args.workers} workers x {threads} threads ({args.model})")
+
+    results = []
+    audio_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(args.model, args.device, threads, args.vad, args.backend, args.spill),
+    ) as executor:
+        if args.batch_size > 1:
+            batches = [files[i:i + args.batch_size] for i in range(0, len(files), args.batch_size)]
+            done = (result for batch in executor.map(transcribe_batch, batches) for result in batch)
+        else:
+            # Files are handed out in small shards so slow files do not stall a worker
+            done = executor.map(transcribe_file, files, chunksize=4)
+        for i, result in enumerate(done, 1):
+            results.append(result)
+            audio_seconds += result["duration"]
+            print(f"[{i}/{len(files)}] {result['recording_id']}: {len(result['word'])} words, "
+                  f"{result['duration']:.1f}s audio in {result['elapsed']:.1f}s")
+    wall = time.perf_counter() - start
+
+    write_table(args.output, build_table(results))
+    print(f"Wrote {args.output}")
+    print(f"{audio_seconds:.0f}s of audio in {wall:.0f}s: realtime factor {wall / audio_seconds:.3f} "
+          f"({audio_seconds / wall:.1f}x realtime)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
-import torch
-import whisper
+import argparse
+from transcription import transcribe
+from whisper_models import default_device
 
-if torch.cuda.is_available():
-    print("CUDA is available. Using GPU.")
-else:
-    print("CUDA is not available. Using CPU.")
+parser = argparse.ArgumentParser(description="Print the word timestamps Whisper finds in a recording.")
+parser.add_argument("audio_path", help="recording to transcribe, e.g. a WAV saved from the GUI")
+parser.add_argument("-m", "--model", default="medium")
+parser.add_argument("--backend", help="whisper, whisper-int8 or faster-whisper (default: $VOICE_ANALYSIS_BACKEND or whisper)")
+parser.add_argument("--device", help="cuda or cpu (default: the backend's, CUDA when available except for whisper-int8)")
+args = parser.parse_args()
 
+device = args.device or default_device(args.backend)
+print("Using GPU." if device == "cuda" else "Using CPU.")
 
-#model = whisper.load_model("medium").to("cuda")
-model = whisper.load_model("medium", device="cuda" if torch.cuda.is_available() else "cpu")
-
-result = model.transcribe("temp_audio.wav", word_timestamps=True)
+result = transcribe(args.audio_path, args.model, device=device, backend=args.backend)  # Reuses cached results for audio seen before
 
 for segment in result["segments"]:
     print(f"Segment: {segment['text']}")
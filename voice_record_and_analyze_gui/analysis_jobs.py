@@ -0,0 +1,99 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AnalysisJob:
+    # Groups the tasks started for one recording. Cancelling a job stops its
+    # queued tasks from running and drops the results of running ones;
+    # long-running work should also poll job.cancelled (transcriptions take
+    # is_cancelled=lambda: job.cancelled) so it stops and frees the model.
+    def __init__(self, job_id):
+        self.id = job_id
+        self.pending = []  # Labels of tasks that have not finished yet
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class AnalysisQueue:
+    # Runs analysis work on a thread pool and hands results back to the Tk
+    # thread. Workers never touch widgets: they put callbacks on a queue that
+    # the Tk loop drains with root.after.
+    def __init__(self, root, max_workers=2, on_status=None, poll_ms=50):
+        self.root = root
+        self.on_status = on_status
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.current = None
+        self._results = queue.Queue()
+        self._next_id = 0
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def new_job(self):
+        self.cancel()
+        self._next_id += 1
+        self.current = AnalysisJob(self._next_id)
+        return self.current
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None
+            self._report_status(None)
+
+    def submit(self, job, label, work, on_done, on_error=None):
+        # work(job) runs on a worker thread; on_done(result) and
+        # on_error(exception) run on the Tk thread.
+        job.pending.append(label)
+        self._report_status(job)
+        self.executor.submit(self._run, job, label, work, on_done, on_error)
+
+    def _run(self, job, label, work, on_done, on_error):
+        if job.cancelled:
+            return
+        try:
+            result = work(job)
+        except Exception as e:
+            self._results.put((job, label, on_error, e))
+        else:
+            self._results.put((job, label, on_done, result))
+
+    def _poll(self):
+        if self._closed:
+            return
+        try:
+            while True:
+                try:
+                    job, label, callback, value = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if job.cancelled:
+                    continue
+                job.pending.remove(label)
+                if callback is not None:
+                    try:
+                        callback(value)
+                    except Exception:
+                        # One failing callback must not hold back the results of the others
+                        print(f"Error in the {label!r} callback:")
+                        traceback.print_exc()
+                self._report_status(job)
+        finally:
+            self.root.after(self.poll_ms, self._poll)
+
+    def _report_status(self, job):
+        if self.on_status is not None:
+            self.on_status(job.pending if job is not None else [])
+
+    def shutdown(self):
+        self.cancel()
+        self._closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
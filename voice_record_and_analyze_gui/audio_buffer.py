@@ -0,0 +1,97 @@
+import threading
+import numpy as np
+
+
+class AudioBuffer:
+    # Growable capture buffer made of preallocated float32 blocks. Appending
+    # never copies previously captured audio, so the PortAudio callback stays
+    # O(block size) no matter how long the session runs.
+    def __init__(self, block_size=16000 * 30, dtype=np.float32):
+        self.block_size = block_size
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._blocks = [np.empty(self.block_size, dtype=self.dtype)]
+            self._fill = 0  # Samples used in the last block
+            self._size = 0
+            self.overflows = 0
+            self.underflows = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, samples):
+        samples = np.asarray(samples, dtype=self.dtype).ravel()
+        with self._lock:
+            pos = 0
+            while pos < samples.size:
+                block = self._blocks[-1]
+                if self._fill == block.size:
+                    block = np.empty(self.block_size, dtype=self.dtype)
+                    self._blocks.append(block)
+                    self._fill = 0
+                n = min(block.size - self._fill, samples.size - pos)
+                block[self._fill:self._fill + n] = samples[pos:pos + n]
+                self._fill += n
+                pos += n
+            self._size += samples.size
+
+    def record_status(self, status):
+        # status is the sounddevice.CallbackFlags passed to the stream callback
+        if status:
+            if status.input_overflow:
+                self.overflows += 1
+            if status.input_underflow:
+                self.underflows += 1
+
+    def capture(self, indata, status, active=True):
+        # The whole input stream callback of the recorder (the GUI and the
+        # benchmarks call this): counts dropouts, and while active stores the
+        # first channel and returns the block's level, None otherwise
+        self.record_status(status)
+        if active:
+            self.append(indata[:, 0])
+            return np.linalg.norm(indata)
+        return None
+
+    @property
+    def xruns(self):
+        return self.overflows + self.underflows
+
+    def read(self, start, stop=None):
+        # Copies samples [start:stop] out of the blocks; safe to call from the
+        # Tk thread while the callback keeps appending.
+        with self._lock:
+            stop = self._size if stop is None else min(stop, self._size)
+            start = max(start, 0)
+            out = np.empty(max(stop - start, 0), dtype=self.dtype)
+            pos, offset = 0, 0
+            for block in self._blocks:
+                n = block.size if block is not self._blocks[-1] else self._fill
+                lo, hi = max(start - offset, 0), min(stop - offset, n)
+                if lo < hi:
+                    out[pos:pos + hi - lo] = block[lo:hi]
+                    pos += hi - lo
+                offset += n
+                if offset >= stop:
+                    break
+            return out
+
+    def view(self):
+        # Returns the captured audio as one contiguous array. Blocks are merged
+        # the first time this is called after new data arrived; afterwards the
+        # result is a view into the merged block and costs nothing.
+        with self._lock:
+            if len(self._blocks) > 1:
+                merged = np.empty(max(self._size, 1), dtype=self.dtype)
+                pos = 0
+                for block in self._blocks[:-1]:
+                    merged[pos:pos + block.size] = block
+                    pos += block.size
+                merged[pos:pos + self._fill] = self._blocks[-1][:self._fill]
+                self._blocks = [merged]
+                self._fill = self._size
+            return self._blocks[0][:self._size]
@@ -0,0 +1,178 @@
+import inspect
+
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE, pad_or_trim
+from whisper.timing import add_word_timestamps
+from whisper.tokenizer import get_tokenizer
+
+import transcription
+import vad as speech_vad
+from recording_analysis import RecordingAnalysis
+from result_cache import default_cache
+from transcription_backends import get_backend
+from whisper_models import get_model
+
+
+TIME_PRECISION = 2 * HOP_LENGTH / SAMPLE_RATE  # seconds per timestamp token
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+# Newer whisper releases need the end of the previous speech for word timing
+_word_timestamp_kwargs = {"last_speech_timestamp": 0.0} if (
+    "last_speech_timestamp" in inspect.signature(add_word_timestamps).parameters) else {}
+
+
+_tokenizers = {}
+
+
+def _tokenizer(model, language):
+    key = (model.is_multilingual, language)
+    if key not in _tokenizers:
+        kwargs = {"num_languages": model.num_languages} if hasattr(model, "num_languages") else {}
+        _tokenizers[key] = get_tokenizer(model.is_multilingual, language=language, task="transcribe", **kwargs)
+    return _tokenizers[key]
+
+
+def _needs_fallback(result):
+    return (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD)
+
+
+def _decode(model, mels, language, fp16):
+    # One batched decode at temperature 0, then the items whisper would
+    # retry are decoded again (still batched) at rising temperatures
+    results = [None] * len(mels)
+    pending = list(range(len(mels)))
+    for temperature in TEMPERATURES:
+        options = whisper.DecodingOptions(language=language, temperature=temperature, fp16=fp16)
+        decoded = whisper.decode(model, mels[pending], options)
+        retry = []
+        for i, result in zip(pending, decoded):
+            results[i] = result
+            if _needs_fallback(result) and not result.no_speech_prob > NO_SPEECH_THRESHOLD:
+                retry.append(i)
+        pending = retry
+        if not pending:
+            break
+    return results
+
+
+def _segments(result, tokenizer, duration):
+    # Splits one window's tokens into segments at consecutive timestamp
+    # tokens, as whisper's transcribe() does
+    tokens = torch.tensor(result.tokens)
+
+    def segment(start, end, segment_tokens):
+        segment_tokens = segment_tokens.tolist()
+        return {
+            "seek": 0, "start": start, "end": end,
+            "text": tokenizer.decode([t for t in segment_tokens if t < tokenizer.eot]),
+            "tokens": segment_tokens, "temperature": result.temperature, "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio, "no_speech_prob": result.no_speech_prob,
+        }
+
+    if not len(tokens):
+        return []
+    is_timestamp = tokens.ge(tokenizer.timestamp_begin)
+    consecutive = (torch.where(is_timestamp[:-1] & is_timestamp[1:])[0] + 1).tolist()
+    if consecutive:
+        if is_timestamp[-2:].tolist() == [False, True]:
+            consecutive.append(len(tokens))
+        segments, last = [], 0
+        for current in consecutive:
+            sliced = tokens[last:current]
+            segments.append(segment((sliced[0].item() - tokenizer.timestamp_begin) * TIME_PRECISION,
+                                    (sliced[-1].item() - tokenizer.timestamp_begin) * TIME_PRECISION, sliced))
+            last = current
+        return segments
+    timestamps = tokens[is_timestamp.nonzero().flatten()]
+    if len(timestamps) and timestamps[-1].item() != tokenizer.timestamp_begin:
+        duration = (timestamps[-1].item() - tokenizer.timestamp_begin) * TIME_PRECISION
+    return [segment(0.0, duration, tokens)]
+
+
+def _transcribe_windows(model, analyses, language, fp16, batch_size):
+    # Transcribes clips of at most 30 s, batch_size windows per encoder and
+    # decoder call. Word timestamps are aligned per clip on its own mel.
+    dtype = torch.float16 if fp16 else torch.float32
+    results = []
+    for first in range(0, len(analyses), batch_size):
+        mels, frames = [], []
+        for analysis in analyses[first:first + batch_size]:
+            mel = torch.from_numpy(analysis.log_mel(model.dims.n_mels, padding=N_SAMPLES))
+            frames.append(min(mel.shape[-1] - N_FRAMES, N_FRAMES))
+            mels.append(pad_or_trim(mel[:, :N_FRAMES], N_FRAMES))
+        mels = torch.stack(mels).to(model.device).to(dtype)
+
+        for mel, n_frames, decoded in zip(mels, frames, _decode(model, mels, language, fp16)):
+            tokenizer = _tokenizer(model, decoded.language)
+            skip = decoded.no_speech_prob > NO_SPEECH_THRESHOLD and decoded.avg_logprob < LOGPROB_THRESHOLD
+            segments = [] if skip else _segments(decoded, tokenizer, n_frames * HOP_LENGTH / SAMPLE_RATE)
+            segments = [s for s in segments if s["start"] != s["end"] and s["text"].strip()]
+            add_word_timestamps(segments=segments, model=model, tokenizer=tokenizer, mel=mel,
+                                num_frames=n_frames, **_word_timestamp_kwargs)
+            for i, s in enumerate(segments):
+                s["id"] = i
+            results.append({"text": "".join(s["text"] for s in segments), "segments": segments,
+                            "language": decoded.language})
+    return results
+
+
+def transcribe_batch(audios, model_name="medium", device=None, batch_size=8, cache=True, vad=False,
+                     backend=None, language=None):
+    # Like transcription.transcribe for a list of 16 kHz clips (float32 or
+    # int16 arrays, or RecordingAnalysis objects whose log-mel is then
+    # reused), returning one result per clip. Clips of up to 30 s are
+    # decoded batch_size at a time; longer clips, and backends that are not
+    # PyTorch Whisper, go through transcription.transcribe one by one.
+    backend = get_backend(backend)
+    device = device or backend.default_device()
+    fp16 = device == "cuda" and backend.name == "whisper"
+    if cache is True:
+        cache = default_cache()
+
+    results = [None] * len(audios)
+    todo = []
+    for i, audio in enumerate(audios):
+        analysis = audio if isinstance(audio, RecordingAnalysis) else RecordingAnalysis(audio)
+        audio = analysis.audio
+        key = None
+        if cache:
+            options = {"word_timestamps": True, "fp16": fp16, "language": language, "batched": True, "vad": vad,
+                       "backend": backend.name}
+            key = cache.key(audio if analysis.pcm is None else analysis.pcm, model_name, options)
+            results[i] = cache.get(key)
+            if results[i] is not None:
+                continue
+        cut = None
+        if vad:
+            cut = speech_vad.SpeechCut(audio, SAMPLE_RATE, speech_vad.speech_regions(audio, SAMPLE_RATE))
+            analysis = RecordingAnalysis(cut.audio)
+        todo.append((i, key, cut, analysis))
+
+    batchable = backend.name in ("whisper", "whisper-int8")
+    short = [t for t in todo if batchable and 0 < len(t[3].audio) <= N_SAMPLES]
+    for i, key, cut, analysis in todo:
+        audio = analysis.audio
+        if not len(audio):
+            results[i] = {"text": "", "segments": [], "language": language}
+        elif not (batchable and len(audio) <= N_SAMPLES):
+            results[i] = transcription.transcribe(audio, model_name, device=device, cache=False, backend=backend.name,
+                                                  language=language)
+
+    if short:
+        model = get_model(model_name, device, backend.name)
+        with transcription._inference_lock:
+            decoded = _transcribe_windows(model, [t[3] for t in short], language, fp16, batch_size)
+        for (i, _, _, _), result in zip(short, decoded):
+            results[i] = result
+
+    for i, key, cut, _ in todo:
+        if cut is not None:
+            cut.map_result(results[i])
+        if key is not None:
+            cache.put(key, results[i])
+    return results
@@ -0,0 +1,193 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from corpus_table import corpus_dir, parse_recording_id
+from wav_io import wav_layout
+
+
+expected_format = (16000, 1, 16)  # sample rate, channels, bits of the corpus recordings
+
+# Per-file columns; text columns become unicode arrays just wide enough for
+# their longest value, so the table loads without pickling
+columns = {
+    "recording_id": str,
+    "speaker": str,
+    "session": np.int16,
+    "utterance": np.int16,
+    "sample_rate": np.int32,
+    "channels": np.int16,
+    "bits": np.int16,
+    "frames": np.int64,
+    "duration": np.float32,
+    "size": np.int64,
+    "mtime_ns": np.int64,
+    "status": str,  # ok, bad_name, malformed, format
+}
+
+
+def scan_file(path):
+    # One index row from the file name and WAV header
+    recording_id = os.path.splitext(os.path.basename(path))[0]
+    speaker, session, utterance = parse_recording_id(recording_id)
+    stat = os.stat(path)
+    row = {
+        "recording_id": recording_id, "speaker": speaker, "session": session, "utterance": utterance,
+        "sample_rate": 0, "channels": 0, "bits": 0, "frames": 0, "duration": 0.0,
+        "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "status": "ok",
+    }
+    try:
+        layout = wav_layout(path)
+    except (OSError, ValueError):
+        row["status"] = "malformed"
+        return row
+    row.update(sample_rate=layout.fs, channels=layout.channels, bits=layout.bits,
+               frames=layout.frames, duration=layout.duration)
+    if session < 0:
+        row["status"] = "bad_name"
+    elif (layout.fs, layout.channels, layout.bits) != expected_format or not layout.frames:
+        row["status"] = "format"
+    return row
+
+
+class CorpusIndex:
+    # Column table of every WAV in the corpus, one row per file
+    def __init__(self, table=None):
+        table = table or {}
+        self.table = {name: np.asarray(table.get(name, []), dtype=dtype) for name, dtype in columns.items()}
+
+    def __len__(self):
+        return len(self.table["recording_id"])
+
+    def __getitem__(self, name):
+        return self.table[name]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def save(self, path):
+        # Written to a temporary file first so a crashed refresh keeps the old index
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, **self.table)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def build(cls, root=corpus_dir, previous=None):
+        # Scans the WAV headers of root. Rows of `previous` whose file size
+        # and mtime are unchanged are reused without opening the file.
+        known = {}
+        if previous is not None and len(previous):
+            for i, recording_id in enumerate(previous["recording_id"].tolist()):
+                known[recording_id] = i
+        rows, scanned = [], 0
+        with os.scandir(root) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if not entry.name.lower().endswith(".wav") or not entry.is_file():
+                    continue
+                i = known.get(os.path.splitext(entry.name)[0])
+                stat = entry.stat()
+                if i is not None and previous["size"][i] == stat.st_size and previous["mtime_ns"][i] == stat.st_mtime_ns:
+                    rows.append(i)
+                else:
+                    rows.append(scan_file(entry.path))
+                    scanned += 1
+        table = {name: [] for name in columns}
+        for row in rows:
+            for name in columns:
+                table[name].append(previous[name][row] if isinstance(row, int) else row[name])
+        index = cls(table)
+        index.scanned = scanned
+        return index
+
+    def select(self, speaker=None, sessions=None, utterances=None, status="ok"):
+        # Row mask; speaker is one id or several, sessions/utterances are a
+        # number or any iterable of numbers (e.g. range(3, 6))
+        mask = np.ones(len(self), dtype=bool)
+        for name, wanted in (("speaker", speaker), ("session", sessions), ("utterance", utterances), ("status", status)):
+            if wanted is None:
+                continue
+            if isinstance(wanted, (str, int)):
+                wanted = [wanted]
+            mask &= np.isin(self.table[name], list(wanted))
+        return mask
+
+    def recording_ids(self, **query):
+        return self.table["recording_id"][self.select(**query)].tolist()
+
+    def flagged(self):
+        mask = self.table["status"] != "ok"
+        return list(zip(self.table["recording_id"][mask].tolist(), self.table["status"][mask].tolist()))
+
+    def missing(self):
+        # Keys absent from a speaker's session x utterance grid, taking the
+        # largest session and utterance numbers seen in the corpus as its size
+        named = self.table["session"] > 0
+        if not named.any():
+            return []
+        n_sessions = int(self.table["session"][named].max())
+        n_utterances = int(self.table["utterance"][named].max())
+        missing = []
+        for speaker in np.unique(self.table["speaker"][named]).tolist():
+            rows = named & (self.table["speaker"] == speaker)
+            grid = np.zeros((n_sessions + 1, n_utterances + 1), dtype=bool)
+            grid[self.table["session"][rows], self.table["utterance"][rows]] = True
+            for session, utterance in zip(*np.nonzero(~grid[1:, 1:])):
+                missing.append(f"{speaker}_{session + 1:02d}_{utterance + 1:02d}")
+        return missing
+
+
+def load_or_build(root=corpus_dir, path="corpus_index.npz"):
+    previous = CorpusIndex.load(path) if os.path.exists(path) else None
+    index = CorpusIndex.build(root, previous)
+    if previous is None or index.scanned or len(index) != len(previous):
+        index.save(path)
+    return index
+
+
+def parse_range(text):
+    # "3" -> [3], "3-5" -> [3, 4, 5], "1,4" -> [1, 4]
+    values = []
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        values += list(range(int(lo), int(hi or lo) + 1))
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the corpus WAVs by speaker, session and utterance.")
+    parser.add_argument("input_dir", nargs="?", default=corpus_dir)
+    parser.add_argument("-o", "--index", default="corpus_index.npz", help="index file, refreshed by file mtime")
+    parser.add_argument("--speaker", action="append", help="only list this speaker (repeatable)")
+    parser.add_argument("--sessions", type=parse_range, help="e.g. 3-5")
+    parser.add_argument("--utterances", type=parse_range, help="e.g. 1,2,10")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = load_or_build(args.input_dir, args.index)
+    elapsed = time.perf_counter() - start
+    print(f"{len(index)} files, {index['duration'].sum() / 3600:.2f} h of audio "
+          f"({index.scanned} headers read in {elapsed:.2f}s, index: {args.index})")
+
+    speakers, counts = np.unique(index["speaker"][index.select()], return_counts=True)
+    print("Files per speaker: " + ", ".join(f"{s}: {n}" for s, n in zip(speakers.tolist(), counts.tolist())))
+    for recording_id, status in index.flagged():
+        print(f"Flagged {recording_id}: {status}")
+    missing = index.missing()
+    if missing:
+        print(f"Missing {len(missing)}: {', '.join(missing)}")
+
+    if args.speaker or args.sessions or args.utterances:
+        start = time.perf_counter()
+        ids = index.recording_ids(speaker=args.speaker, sessions=args.sessions, utterances=args.utterances)
+        elapsed = time.perf_counter() - start
+        print(f"{len(ids)} matching recordings ({elapsed * 1000:.2f} ms):")
+        for recording_id in ids:
+            print(recording_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from corpus_table import corpus_dir
+from wav_io import wav_layout
+
+
+class CorpusReader:
+    # Opens corpus WAVs as memory maps of their 16-bit PCM payload, so a
+    # segment only pages in the bytes it covers. Slices of pcm() are int16
+    # views; segment() converts just the requested slice to float32. At most
+    # max_open maps are kept, least recently used first out.
+    def __init__(self, root=corpus_dir, max_open=256):
+        self.root = root
+        self.max_open = max_open
+        self._maps = OrderedDict()
+
+    def path(self, recording_id):
+        return os.path.join(self.root, recording_id + ".wav")
+
+    def recording_ids(self):
+        return sorted(f[:-4] for f in os.listdir(self.root) if f.lower().endswith(".wav"))
+
+    def open(self, recording_id):
+        # (int16 memmap shaped (frames,) or (frames, channels), sample rate)
+        entry = self._maps.get(recording_id)
+        if entry is not None:
+            self._maps.move_to_end(recording_id)
+            return entry
+        path = self.path(recording_id)
+        layout = wav_layout(path)
+        if layout.bits != 16:
+            raise ValueError(f"{path}: {layout.bits}-bit PCM, expected 16-bit")
+        shape = (layout.frames, layout.channels) if layout.channels > 1 else (layout.frames,)
+        if layout.frames:
+            pcm = np.memmap(path, dtype="<i2", mode="r", offset=layout.data_offset, shape=shape)
+        else:
+            pcm = np.zeros(shape, dtype="<i2")  # mmap cannot map zero bytes
+        entry = self._maps[recording_id] = (pcm, layout.fs)
+        while len(self._maps) > self.max_open:
+            self._maps.popitem(last=False)
+        return entry
+
+    def pcm(self, recording_id):
+        return self.open(recording_id)[0]
+
+    def sample_rate(self, recording_id):
+        return self.open(recording_id)[1]
+
+    def duration(self, recording_id):
+        pcm, fs = self.open(recording_id)
+        return len(pcm) / fs
+
+    def segment_pcm(self, recording_id, start=0.0, end=None):
+        # int16 view of [start, end) seconds, without copying
+        pcm, fs = self.open(recording_id)
+        first = min(max(int(round(start * fs)), 0), len(pcm))
+        last = len(pcm) if end is None else min(max(int(round(end * fs)), first), len(pcm))
+        return pcm[first:last]
+
+    def segment(self, recording_id, start=0.0, end=None):
+        # float32 samples in [-1, 1) of [start, end) seconds, mixed to mono
+        pcm = self.segment_pcm(recording_id, start, end)
+        if pcm.ndim > 1:
+            return pcm.mean(axis=1, dtype=np.float32) / 32768.0
+        return pcm.astype(np.float32) / 32768.0
+
+    def segments(self, spans):
+        # Yields segment() for each (recording_id, start, end); spans sorted
+        # by recording keep each file's pages hot
+        for recording_id, start, end in spans:
+            yield self.segment(recording_id, start, end)
+
+    def close(self):
+        self._maps.clear()
@@ -0,0 +1,98 @@
+import os
+import re
+
+import numpy as np
+
+
+# Layout of the kids' corpus and of the word table Whisper_Batch_Corpus.py
+# writes, shared by the tools that read either
+corpus_dir = os.path.join("..", "Non_Native_Kids_Voice_Database")
+name_pattern = re.compile(r"^([A-Za-z]+\d+)_(\d+)_(\d+)$")  # F10_01_01 -> speaker, session, utterance
+speaker_pattern = re.compile(r"^([A-Za-z]+\d+)_")  # F10_01_01 -> F10, also for other suffixes
+
+
+def parse_recording_id(recording_id):
+    match = name_pattern.match(recording_id)
+    if not match:
+        return recording_id, -1, -1
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+def speaker_of(recording_id):
+    match = speaker_pattern.match(recording_id)
+    return match.group(1) if match else recording_id
+
+
+def build_table(results):
+    columns = {name: [] for name in ("recording_id", "speaker", "session", "utterance", "word", "start", "end", "probability")}
+    for result in results:
+        n = len(result["word"])
+        speaker, session, utterance = parse_recording_id(result["recording_id"])
+        columns["recording_id"] += [result["recording_id"]] * n
+        columns["speaker"] += [speaker] * n
+        columns["session"] += [session] * n
+        columns["utterance"] += [utterance] * n
+        for name in ("word", "start", "end", "probability"):
+            columns[name] += result[name]
+    return {
+        "recording_id": np.array(columns["recording_id"], dtype=str),
+        "speaker": np.array(columns["speaker"], dtype=str),
+        "session": np.array(columns["session"], dtype=np.int16),
+        "utterance": np.array(columns["utterance"], dtype=np.int16),
+        "word": np.array(columns["word"], dtype=str),
+        "start": np.array(columns["start"], dtype=np.float32),
+        "end": np.array(columns["end"], dtype=np.float32),
+        "probability": np.array(columns["probability"], dtype=np.float32),
+    }
+
+
+def write_table(path, table):
+    # Parquet for a .parquet path (needs pyarrow, so check for it before a
+    # long run), otherwise a NumPy .npz with one array per column.
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrays = {}
+        for name, values in table.items():
+            array = pa.array(values.tolist() if values.dtype.kind == "U" else values)
+            arrays[name] = array.dictionary_encode() if name in ("recording_id", "speaker") else array
+        pq.write_table(pa.table(arrays), path)
+    else:
+        np.savez_compressed(path, **table)
+
+
+def read_table(path, columns=None):
+    # The columns written by write_table (all, or the named ones) as NumPy
+    # arrays
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=columns)
+        columns = {}
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            columns[name] = column.to_numpy(zero_copy_only=False)
+        return columns
+    with np.load(path) as data:
+        return {name: data[name] for name in (columns or data.files)}
+
+
+def group_words(table):
+    # {recording_id: (words, starts, ends)} from the flat table, words in
+    # table order within each recording
+    ids = np.asarray(table["recording_id"]).astype(str)
+    order = np.argsort(ids, kind="stable")
+    keys, first = np.unique(ids[order], return_index=True)
+    bounds = np.append(first, len(order))
+    words = np.asarray(table["word"]).astype(str)
+    starts = np.asarray(table["start"], dtype=np.float64)
+    ends = np.asarray(table["end"], dtype=np.float64)
+    groups = {}
+    for key, lo, hi in zip(keys.tolist(), bounds[:-1], bounds[1:]):
+        rows = order[lo:hi]
+        groups[key] = (words[rows].tolist(), starts[rows], ends[rows])
+    return groups
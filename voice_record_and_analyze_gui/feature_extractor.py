@@ -0,0 +1,258 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from corpus_reader import CorpusReader, corpus_dir
+from interval_index import IntervalIndex
+
+
+SAMPLE_RATE = 16000
+N_FFT = 400  # 25 ms window
+HOP = 160  # 10 ms hop, the frame rate Whisper uses too
+N_MELS = 40
+N_MFCC = 13
+F0_RANGE = (70.0, 600.0)  # Hz; children's voices sit high in this range
+PITCH_WINDOW = 640  # 40 ms, long enough for two periods at the lowest F0
+
+_filterbanks = {}
+
+
+def hz_to_mel(hz):
+    # Slaney mel scale: linear below 1 kHz, logarithmic above
+    hz = np.asarray(hz, dtype=np.float64)
+    mel = hz / (200.0 / 3)
+    log_part = hz >= 1000.0
+    return np.where(log_part, 15.0 + np.log(np.maximum(hz, 1e-10) / 1000.0) / (np.log(6.4) / 27), mel)
+
+
+def mel_to_hz(mel):
+    mel = np.asarray(mel, dtype=np.float64)
+    hz = mel * (200.0 / 3)
+    log_part = mel >= 15.0
+    return np.where(log_part, 1000.0 * np.exp((np.log(6.4) / 27) * (mel - 15.0)), hz)
+
+
+def mel_filterbank(fs=SAMPLE_RATE, n_fft=N_FFT, n_mels=N_MELS, fmin=0.0, fmax=None):
+    # (n_mels, n_fft // 2 + 1) triangular filters with Slaney area
+    # normalization; the same matrix librosa.filters.mel builds by default
+    key = (fs, n_fft, n_mels, fmin, fmax)
+    if key not in _filterbanks:
+        fft_freqs = np.fft.rfftfreq(n_fft, 1.0 / fs)
+        mel_freqs = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax or fs / 2.0), n_mels + 2))
+        widths = np.diff(mel_freqs)
+        ramps = mel_freqs[:, None] - fft_freqs[None, :]
+        lower = -ramps[:-2] / widths[:-1, None]
+        upper = ramps[2:] / widths[1:, None]
+        weights = np.maximum(0.0, np.minimum(lower, upper))
+        weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:-2]))[:, None]
+        _filterbanks[key] = weights.astype(np.float32)
+    return _filterbanks[key]
+
+
+def dct_matrix(n_out, n_in):
+    # Orthonormal DCT-II rows, applied to log-mel frames to get MFCCs
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    basis = np.cos(np.pi / n_in * (n + 0.5) * k) * np.sqrt(2.0 / n_in)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+def frames(audio, frame_length, hop=HOP):
+    # Pitch frames: frame i is centered on sample i * hop (reflect padded at
+    # the ends). Returns a strided view, no copy.
+    pad = frame_length // 2
+    mode = "reflect" if len(audio) > pad else "constant"
+    padded = np.pad(audio, (pad, pad), mode=mode)
+    n_frames = 1 + len(audio) // hop
+    if len(padded) < frame_length + (n_frames - 1) * hop:
+        padded = np.pad(padded, (0, frame_length + (n_frames - 1) * hop - len(padded)))
+    return np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop][:n_frames]
+
+
+def pitch(audio, fs=SAMPLE_RATE, hop=HOP, window=PITCH_WINDOW, f0_range=F0_RANGE, threshold=0.45):
+    # Autocorrelation pitch for every frame at once: the FFT of each
+    # windowed frame gives its autocorrelation, the strongest peak within
+    # the F0 range gives the period. Unvoiced frames are NaN.
+    x = frames(audio, window, hop).astype(np.float32)
+    x = x - x.mean(axis=1, keepdims=True)
+    x = x * np.hanning(window).astype(np.float32)
+    spectrum = np.fft.rfft(x, n=2 * window, axis=1)
+    ac = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, axis=1)[:, :window]
+    ac /= np.maximum(ac[:, :1], 1e-10)
+    lo = int(fs / f0_range[1])
+    hi = min(int(fs / f0_range[0]) + 1, window - 1)
+    lag = lo + np.argmax(ac[:, lo:hi], axis=1)
+    rows = np.arange(len(lag))
+    peak = ac[rows, lag]
+    # Parabolic interpolation of the peak for sub-sample periods
+    left, right = ac[rows, lag - 1], ac[rows, lag + 1]
+    curvature = left - 2 * peak + right
+    shift = np.where(curvature < 0, 0.5 * (left - right) / np.where(curvature < 0, curvature, -1), 0.0)
+    f0 = fs / (lag + shift)
+    return np.where(peak >= threshold, f0, np.nan).astype(np.float32)
+
+
+def extract(audio, fs=SAMPLE_RATE, n_mels=N_MELS, n_mfcc=N_MFCC, analysis=None):
+    # Frame-level features of one recording, 100 frames per second. The
+    # spectrum always comes from a RecordingAnalysis (the one passed in, or
+    # a new one), so the features match the GUI's and Whisper's frames.
+    from recording_analysis import RecordingAnalysis
+
+    audio = np.asarray(audio, dtype=np.float32)
+    if analysis is None:
+        analysis = RecordingAnalysis(audio, fs)
+    n_frames = 1 + len(audio) // HOP
+    power = analysis.power()[:n_frames]
+    log_mel = analysis.mel_log10(n_mels)[:, :n_frames].T * np.log(10.0)
+    energy = 10 * np.log10(np.maximum(power.sum(axis=1) / N_FFT, 1e-10))
+    f0 = pitch(audio, fs)
+    f0[energy < energy.max() - 50] = np.nan  # Ignore periodic noise in silence
+    return {
+        "times": (np.arange(len(power)) * HOP / fs).astype(np.float32),
+        "log_mel": log_mel.astype(np.float32),
+        "mfcc": log_mel @ dct_matrix(n_mfcc, n_mels).T,
+        "energy": energy.astype(np.float32),
+        "f0": f0,
+    }
+
+
+def pool(features, starts, ends):
+    # Mean (and MFCC standard deviation) of the frames centered inside each
+    # [start, end) span, from cumulative sums so every span costs O(1).
+    # Spans shorter than a frame use the frame nearest their start.
+    times = features["times"]
+    lo = np.searchsorted(times, starts, side="left")
+    hi = np.maximum(np.searchsorted(times, ends, side="left"), lo + 1)
+    lo = np.minimum(lo, len(times) - 1)
+    hi = np.minimum(hi, len(times))
+    count = (hi - lo).astype(np.float32)
+
+    def span_sum(values):
+        csum = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0, dtype=np.float64)])
+        return csum[hi] - csum[lo]
+
+    def span_mean(values):
+        return (span_sum(values) / (count if values.ndim == 1 else count[:, None])).astype(np.float32)
+
+    voiced = ~np.isnan(features["f0"])
+    voiced_count = span_sum(voiced.astype(np.float32))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f0_mean = span_sum(np.where(voiced, features["f0"], 0.0)) / voiced_count
+    mfcc_mean = span_mean(features["mfcc"])
+    mfcc_var = span_mean(features["mfcc"].astype(np.float64) ** 2) - mfcc_mean.astype(np.float64) ** 2
+    return {
+        "frames": count.astype(np.int32),
+        "mfcc_mean": mfcc_mean,
+        "mfcc_std": np.sqrt(np.maximum(mfcc_var, 0.0)).astype(np.float32),
+        "log_mel_mean": span_mean(features["log_mel"]),
+        "energy_mean": span_mean(features["energy"]),
+        "f0_mean": f0_mean.astype(np.float32),
+        "voiced_fraction": (voiced_count / count).astype(np.float32),
+    }
+
+
+def load_spans(source, path):
+    # {recording_id: IntervalIndex} of the spans to pool over. "mfa" reads a
+    # phonemes_time_csv / words_time_csv folder, "whisper" the table
+    # written by Whisper_Batch_Corpus.py.
+    if source == "mfa":
+        return {name[:-4]: IntervalIndex.from_csv(os.path.join(path, name))
+                for name in sorted(os.listdir(path)) if name.endswith(".csv")}
+    from corpus_table import group_words, read_table
+
+    table = read_table(path, columns=["recording_id", "word", "start", "end"])
+    return {recording_id: IntervalIndex(starts, ends, words)
+            for recording_id, (words, starts, ends) in group_words(table).items()}
+
+
+# Set in each worker process by init_worker
+worker_reader = None
+worker_cache = None
+
+
+def init_worker(root, spill=False):
+    global worker_reader, worker_cache
+    from result_cache import ArrayCache
+
+    worker_reader = CorpusReader(root)
+    worker_cache = ArrayCache() if spill else None
+
+
+def extract_file(task):
+    from recording_analysis import RecordingAnalysis
+
+    recording_id, spans = task
+    fs = worker_reader.sample_rate(recording_id)
+    pcm = worker_reader.segment_pcm(recording_id)
+    analysis = RecordingAnalysis(pcm if pcm.ndim == 1 else worker_reader.segment(recording_id), fs, worker_cache)
+    audio = analysis.audio
+    features = extract(audio, fs, analysis=analysis)
+    if spans is None:  # Whole recording as one span
+        starts, ends, labels = np.zeros(1), np.array([len(audio) / fs]), [""]
+    else:
+        starts, ends, labels = spans.starts, spans.ends, [spans.labels[i] for i in spans.order]
+    pooled = pool(features, starts, ends)
+    pooled.update(recording_id=[recording_id] * len(starts), label=labels,
+                  start=starts.astype(np.float32), end=ends.astype(np.float32))
+    return pooled
+
+
+def write_store(path, results):
+    # One row per span; text columns as unicode arrays, features as float32
+    # (log-mel means as float16), all in one compressed npz
+    columns = {}
+    for name in results[0]:
+        columns[name] = np.concatenate([np.asarray(r[name]) for r in results])
+    columns["recording_id"] = columns["recording_id"].astype(str)
+    columns["label"] = columns["label"].astype(str)
+    columns["log_mel_mean"] = columns["log_mel_mean"].astype(np.float16)
+    columns["config"] = np.array([SAMPLE_RATE, N_FFT, HOP, N_MELS, N_MFCC], dtype=np.int32)
+    np.savez_compressed(path, **columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pool MFCC, log-mel, energy and F0 over word or phone spans of a corpus.")
+    parser.add_argument("input_dir", nargs="?", default=corpus_dir)
+    parser.add_argument("-o", "--output", default="features.npz")
+    parser.add_argument("--mfa", metavar="CSV_DIR", help="pool over MFA spans, e.g. phonemes_time_csv")
+    parser.add_argument("--whisper", metavar="TABLE", help="pool over the words of a Whisper_Batch_Corpus.py table")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--limit", type=int, default=0, help="only process the first N recordings")
+    parser.add_argument("--spill", action="store_true",
+                        help="keep the spectra in the on-disk feature cache, shared with Whisper_Batch_Corpus.py --spill")
+    args = parser.parse_args()
+
+    reader = CorpusReader(args.input_dir)
+    recording_ids = reader.recording_ids()
+    spans = None
+    if args.mfa or args.whisper:
+        spans = load_spans("mfa", args.mfa) if args.mfa else load_spans("whisper", args.whisper)
+        recording_ids = [r for r in recording_ids if r in spans]
+    if args.limit:
+        recording_ids = recording_ids[:args.limit]
+    if not recording_ids:
+        print("No recordings to process.")
+        return
+
+    tasks = [(r, spans[r] if spans is not None else None) for r in recording_ids]
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(args.input_dir, args.spill)) as executor:
+        for i, result in enumerate(executor.map(extract_file, tasks, chunksize=8), 1):
+            results.append(result)
+            if i % 100 == 0 or i == len(tasks):
+                print(f"[{i}/{len(tasks)}] {result['recording_id'][0]}")
+    elapsed = time.perf_counter() - start
+
+    write_store(args.output, results)
+    audio_seconds = sum(reader.duration(r) for r in recording_ids)
+    print(f"Wrote {sum(len(r['start']) for r in results)} spans to {args.output}")
+    print(f"{audio_seconds:.0f}s of audio in {elapsed:.1f}s ({audio_seconds / elapsed:.0f}x realtime)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import csv
+
+import numpy as np
+
+
+class IntervalIndex:
+    # Time intervals (words, phones) kept as start-sorted arrays so point
+    # and range lookups are binary searches. Every query also takes arrays
+    # of times, and results are row numbers in the order the intervals were
+    # given (e.g. positions in word_timestamps or CSV rows).
+    def __init__(self, starts, ends, labels=None):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        # Latest end among all intervals starting at or before each one;
+        # keeps range queries exact when intervals overlap
+        self.reach = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        self.labels = list(labels) if labels is not None else None
+
+    @classmethod
+    def from_words(cls, words):
+        # Whisper word dicts as returned with word_timestamps=True
+        return cls([w["start"] for w in words], [w["end"] for w in words], [w["word"].strip() for w in words])
+
+    @classmethod
+    def from_csv(cls, path):
+        # MFA words_time_csv / phonemes_time_csv file: label, start, end, ...
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))[1:]
+        return cls([float(r[1]) for r in rows], [float(r[2]) for r in rows], [r[0] for r in rows])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def label(self, i):
+        return self.labels[i] if i >= 0 else None
+
+    def at(self, t):
+        # Row of the interval covering time t (start <= t < end), -1 if none.
+        # Where intervals overlap, the one that started last wins.
+        t = np.asarray(t, dtype=np.float64)
+        times = np.atleast_1d(t)
+        rows = np.full(times.shape, -1, dtype=np.int64)
+        if len(self):
+            i = np.searchsorted(self.starts, times, side="right") - 1
+            j = np.maximum(i, 0)
+            inside = (i >= 0) & (times < self.ends[j])
+            rows[inside] = self.order[i[inside]]
+            # An earlier, longer interval may still cover t; only possible
+            # where intervals overlap, so these are walked back one by one
+            for k in np.flatnonzero(~inside & (i >= 0) & (times < self.reach[j])):
+                n = i[k]
+                while self.ends[n] <= times[k]:
+                    n -= 1
+                rows[k] = self.order[n]
+        return rows if t.ndim else int(rows[0])
+
+    def overlapping(self, t0, t1):
+        # Rows of every interval overlapping [t0, t1), in time order
+        lo = np.searchsorted(self.reach, t0, side="right")
+        hi = np.searchsorted(self.starts, t1, side="left")
+        candidates = np.arange(lo, max(hi, lo))
+        return self.order[candidates[self.ends[candidates] > t0]]
@@ -0,0 +1,135 @@
+import numpy as np
+from matplotlib.patches import Polygon
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class IncrementalSTFT:
+    # Short-time Fourier transform over a growing signal. Each call consumes
+    # only the samples that arrived since the previous one and returns the
+    # frames that became complete, in dB.
+    def __init__(self, fs, nfft=512, hop=256):
+        self.fs = fs
+        self.nfft = nfft
+        self.hop = hop
+        self.window = np.hanning(nfft).astype(np.float32)
+        # Same density scaling as mlab.specgram, so levels match the final plot
+        self.scale = 2.0 / (fs * np.sum(self.window ** 2))
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def reset(self):
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def process(self, samples, max_frames=None):
+        data = np.concatenate((self._tail, np.asarray(samples, dtype=np.float32)))
+        n_frames = 0 if len(data) < self.nfft else 1 + (len(data) - self.nfft) // self.hop
+        self._tail = data[n_frames * self.hop:]
+        if n_frames == 0:
+            return np.empty((0, self.nfft // 2 + 1), dtype=np.float32)
+
+        first = 0
+        if max_frames is not None and n_frames > max_frames:
+            first = n_frames - max_frames  # Fell behind: skip to the newest frames
+        frames = sliding_window_view(data, self.nfft)[first * self.hop:n_frames * self.hop:self.hop]
+        power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2 * self.scale
+        return (10.0 * np.log10(power + 1e-20)).astype(np.float32)
+
+
+class BlitPanel:
+    # Redraws a few animated artists over a cached axes background.
+    def __init__(self, ax, artists):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.artists = artists
+        for artist in artists:
+            artist.set_animated(True)
+        self.background = None
+        self._cid = self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def blit(self):
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.ax.bbox)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._cid)
+        for artist in self.artists:
+            artist.set_animated(False)
+
+
+class LiveSpectrogram(BlitPanel):
+    # Fixed-size scrolling spectrogram of the last `seconds` of audio.
+    def __init__(self, ax, fs, seconds=10, nfft=512, hop=256, dynamic_range=80):
+        self.stft = IncrementalSTFT(fs, nfft, hop)
+        self.columns = int(seconds * fs / hop)
+        self.dynamic_range = dynamic_range
+        self.peak = None
+        self.image = np.full((nfft // 2 + 1, self.columns), -200.0, dtype=np.float32)
+        self.im = ax.imshow(self.image, origin="lower", aspect="auto", cmap="viridis",
+                            extent=(-seconds, 0, 0, fs / 2), interpolation="nearest")
+        ax.set_title("Spectrogram (live)")
+        ax.set_xlabel("Time [s]")
+        ax.set_ylabel("Frequency [Hz]")
+        super().__init__(ax, [self.im])
+
+    def update(self, samples):
+        frames = self.stft.process(samples, max_frames=self.columns)
+        k = len(frames)
+        if k == 0:
+            return
+        self.image[:, :-k] = self.image[:, k:]
+        self.image[:, -k:] = frames.T
+        frame_peak = float(frames.max())
+        self.peak = frame_peak if self.peak is None else max(self.peak, frame_peak)
+        self.im.set_data(self.image)
+        self.im.set_clim(self.peak - self.dynamic_range, self.peak)
+        self.blit()
+
+
+class LiveWaveform(BlitPanel):
+    # Min/max envelope of the last `seconds` of audio, drawn as one filled
+    # polygon (much cheaper to rasterize than a zigzag line).
+    def __init__(self, ax, fs, seconds=10, points=1000):
+        self.fs = fs
+        self.samples = int(seconds * fs)
+        self.bin = max(self.samples // points, 1)
+        self.bins = self.samples // self.bin
+        self.mins = np.zeros(self.bins, dtype=np.float32)
+        self.maxs = np.zeros(self.bins, dtype=np.float32)
+        self._partial = np.zeros(0, dtype=np.float32)
+        time = np.linspace(-seconds, 0, self.bins)
+        self.vertices = np.column_stack((np.concatenate((time, time[::-1])), np.zeros(2 * self.bins)))
+        self.envelope = Polygon(self.vertices, closed=True, label="Waveform")
+        ax.add_patch(self.envelope)
+        ax.set_xlim(-seconds, 0)
+        ax.set_ylim(-1, 1)
+        ax.set_title("Waveform (live)")
+        ax.set_xlabel("Time [s]")
+        ax.set_ylabel("Amplitude")
+        super().__init__(ax, [self.envelope])
+
+    def update(self, samples):
+        data = np.concatenate((self._partial, np.asarray(samples, dtype=np.float32)))
+        n = len(data) // self.bin
+        self._partial = data[n * self.bin:]
+        if n == 0:
+            return
+        n_keep = min(n, self.bins)
+        frames = data[(n - n_keep) * self.bin:n * self.bin].reshape(n_keep, self.bin)
+        for ring, values in ((self.mins, frames.min(axis=1)), (self.maxs, frames.max(axis=1))):
+            ring[:-n_keep] = ring[n_keep:]
+            ring[-n_keep:] = values
+        self.vertices[:self.bins, 1] = self.maxs
+        self.vertices[self.bins:, 1] = self.mins[::-1]
+        self.envelope.set_xy(self.vertices)
+        self.blit()
@@ -0,0 +1,103 @@
+import numpy as np
+
+from feature_extractor import HOP, N_FFT, SAMPLE_RATE, mel_filterbank
+
+
+WHISPER_N_MELS = 80
+WHISPER_PADDING = 30 * SAMPLE_RATE  # whisper.transcribe appends one window of silence
+
+
+class RecordingAnalysis:
+    # The short-time power spectrum of one recording, computed once and
+    # shared by everything drawn or derived from it: the GUI spectrogram,
+    # Whisper's log-mel input and the corpus frame features. Frame i is
+    # centered on sample i * HOP with Whisper's 25 ms periodic Hann window;
+    # the start is reflect padded and the end zero padded, as in Whisper's
+    # log_mel_spectrogram(audio, padding=N_SAMPLES).
+    #
+    # Arrays are memoized on the object. With an ArrayCache they are also
+    # spilled to disk, keyed by the audio content, so another run over the
+    # same corpus loads them instead of redoing the FFTs.
+    def __init__(self, audio, fs=SAMPLE_RATE, cache=None):
+        audio = np.asarray(audio)
+        self.pcm = audio if audio.dtype == np.int16 else None  # hashed as is when available
+        if self.pcm is not None:
+            self.audio = audio.astype(np.float32) / 32768.0
+        else:
+            self.audio = np.ascontiguousarray(audio, dtype=np.float32)  # no copy of a float32 take
+        self.fs = fs
+        self.cache = cache
+        self._arrays = {}
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.fs
+
+    def _memo(self, name, compute, **params):
+        key = (name,) + tuple(sorted(params.items()))
+        if key in self._arrays:
+            return self._arrays[key]
+        array = None
+        if self.cache is not None:
+            cache_key = self.cache.key(self.audio if self.pcm is None else self.pcm, name, dict(params, fs=self.fs))
+            array = self.cache.get(cache_key)
+        if array is None:
+            array = compute()
+            if self.cache is not None:
+                self.cache.put(cache_key, array)
+        self._arrays[key] = array
+        return array
+
+    def power(self):
+        # (frames, N_FFT // 2 + 1) float32 power spectrum. The last frames
+        # reach past the end so every window that sees audio is included.
+        return self._memo("power", self._power)
+
+    def _power(self):
+        pad = N_FFT // 2
+        n_frames = (len(self.audio) + pad - 1) // HOP + 1
+        mode = "reflect" if len(self.audio) > pad else "constant"
+        padded = np.pad(self.audio, (pad, 0), mode=mode)
+        padded = np.pad(padded, (0, max(N_FFT + (n_frames - 1) * HOP - len(padded), 0)))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP][:n_frames]
+        window = np.hanning(N_FFT + 1)[:-1].astype(np.float32)
+        spectrum = np.fft.rfft(frames * window, axis=1)
+        return (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+
+    def times(self):
+        return np.arange(len(self.power())) * HOP / self.fs
+
+    def spectrogram_image(self):
+        # (Z, extent) for imshow, the GUI spectrogram: power spectral
+        # density in dB, scaled like matplotlib's specgram, high
+        # frequencies first
+        if "spectrogram" not in self._arrays:
+            window = np.hanning(N_FFT + 1)[:-1]
+            psd = self.power().T / (self.fs * (window ** 2).sum())
+            psd[1:-1] *= 2  # one-sided
+            floor = max(psd.max(), 1e-20) * 1e-12  # 120 dB of range; digital silence would be -inf
+            Z = np.flipud(10.0 * np.log10(np.maximum(psd, floor))).astype(np.float32)
+            times = self.times()
+            half = HOP / self.fs / 2
+            extent = (times[0] - half, times[-1] + half, 0.0, self.fs / 2)
+            self._arrays["spectrogram"] = (Z, extent)
+        return self._arrays["spectrogram"]
+
+    def mel_log10(self, n_mels=WHISPER_N_MELS):
+        # log10 mel energies of the computed frames, (n_mels, frames)
+        return self._memo("mel_log10", lambda: np.log10(np.maximum(
+            mel_filterbank(self.fs, N_FFT, n_mels) @ self.power().T, 1e-10)).astype(np.float32), n_mels=n_mels)
+
+    def log_mel(self, n_mels=WHISPER_N_MELS, padding=WHISPER_PADDING):
+        # Whisper's input: what whisper.log_mel_spectrogram(audio, n_mels,
+        # padding) returns, as a float32 array. The padding frames are
+        # silence, so only the frames that see audio are ever computed.
+        if self.fs != SAMPLE_RATE:
+            raise ValueError(f"Whisper needs {SAMPLE_RATE} Hz audio, got {self.fs} Hz")
+        mel = self.mel_log10(n_mels)
+        n_frames = (len(self.audio) + padding) // HOP
+        log_spec = np.full((n_mels, n_frames), -10.0, dtype=np.float32)  # log10 of the 1e-10 floor
+        computed = min(n_frames, mel.shape[1])
+        log_spec[:, :computed] = mel[:, :computed]
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
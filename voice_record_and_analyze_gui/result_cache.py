@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+default_dir = os.environ.get("VOICE_ANALYSIS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "voice_analysis"))
+
+
+def content_hash(audio):
+    # Hashes the 16-bit PCM content. Float audio is quantized the way
+    # save_audio writes it, so a take and its saved WAV share one entry.
+    audio = np.asarray(audio)
+    if audio.dtype != np.int16:
+        audio = (audio * 32767).astype(np.int16)
+    return hashlib.sha256(np.ascontiguousarray(audio).astype("<i2", copy=False).tobytes()).hexdigest()
+
+
+class ResultCache:
+    # JSON results on disk, keyed by audio content hash + model + options.
+    # Reads refresh the file's mtime; once the directory grows past
+    # max_bytes the least recently used entries are deleted. The directory
+    # size is tracked as a running total, so a put only scans the directory
+    # when the total passes max_bytes, or every rescan_every puts to pick
+    # up what other processes wrote. Eviction goes down to low_water of
+    # max_bytes so the next scan is many puts away.
+    suffix = ".json"
+    rescan_every = 256
+    low_water = 0.9
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024, kind="transcripts"):
+        self.directory = os.path.join(directory or default_dir, kind)
+        self.max_bytes = max_bytes
+        self._bytes = None  # Running size of the entries, None until first scanned
+        self._puts = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, audio, model_name, options=None):
+        description = json.dumps([content_hash(audio), model_name, options or {}], sort_keys=True, default=str)
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return result
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def put(self, key, result):
+        self._write(key, "w", lambda f: json.dump(result, f, default=float), encoding="utf-8")
+
+    def _write(self, key, mode, write, **open_args):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode, **open_args) as f:
+                write(f)
+            path = self._path(key)
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._puts += 1
+        if self._bytes is None or self._puts % self.rescan_every == 0:
+            self._bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._bytes += os.path.getsize(path) - replaced
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except OSError:  # Removed by another process meanwhile
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            self._bytes = total
+            return
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * self.low_water:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._bytes = total
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                os.remove(entry.path)
+        self._bytes = 0
+
+
+class ArrayCache(ResultCache):
+    # NumPy arrays on disk (.npy, memory-mapped on read) with the same keys
+    # and LRU eviction, for feature arrays spilled by corpus runs
+    suffix = ".npy"
+
+    def __init__(self, directory=None, max_bytes=2 * 1024 ** 3, kind="features"):
+        super().__init__(directory, max_bytes, kind)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return array
+
+    def put(self, key, array):
+        self._write(key, "wb", lambda f: np.save(f, np.asarray(array)))
+
+
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
@@ -0,0 +1,43 @@
+from matplotlib.patches import Rectangle
+
+
+class SpanHighlighter:
+    # Marks a time span on an already drawn axes. The span is an animated
+    # artist, so moving it restores the cached background of the axes and
+    # blits only the span instead of redrawing the whole figure. The span
+    # joins the axes legend the first time it is shown.
+    def __init__(self, ax, color="red", alpha=0.3, label="Selected Word", legend_loc="upper right"):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.label = label
+        self.legend_loc = legend_loc
+        self.span = Rectangle((0, 0), 0, 1, transform=ax.get_xaxis_transform(),
+                              color=color, alpha=alpha, label="_nolegend_", animated=True)
+        ax.add_artist(self.span)
+        self.background = None
+        self._cid = self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # Any full redraw (resize, zoom, pan) invalidates the cached background
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.span)
+
+    def show(self, start, end):
+        self.span.set_x(start)
+        self.span.set_width(end - start)
+        if self.span.get_label() != self.label:
+            # The legend is part of the cached background, so adding the
+            # span's entry needs one full redraw
+            self.span.set_label(self.label)
+            self.ax.legend(loc=self.legend_loc)
+            self.canvas.draw()
+            return
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.span)
+        self.canvas.blit(self.ax.bbox)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._cid)
@@ -0,0 +1,80 @@
+import threading
+
+import numpy as np
+
+import transcription
+
+
+def quiet_point(audio, fs, search_seconds, frame_seconds=0.02):
+    # Index of the quietest frame in the last search_seconds of audio, used
+    # as the window cut so words are not split across windows.
+    frame = max(int(frame_seconds * fs), 1)
+    lo = max(len(audio) - int(search_seconds * fs), 0)
+    n = (len(audio) - lo) // frame
+    if n == 0:
+        return len(audio)
+    energy = (audio[lo:lo + n * frame].reshape(n, frame) ** 2).mean(axis=1)
+    return lo + int(np.argmin(energy)) * frame + frame // 2
+
+
+class StreamingTranscriber:
+    # Transcribes a growing AudioBuffer in windows of `window` seconds. Each
+    # window is cut at the quietest point of its last `search` seconds; words
+    # before the cut are final, and the next window starts `overlap` seconds
+    # before the cut. Words that the overlap transcribes a second time are
+    # dropped by time, so the stitched list has no duplicates. Windows are
+    # never cached (each one is transcribed once); vad is passed through to
+    # transcription.transcribe.
+    def __init__(self, buffer, fs, model_name, window=30.0, search=3.0, overlap=1.0, vad=False, **options):
+        self.buffer = buffer
+        self.fs = fs
+        self.model_name = model_name
+        self.window = int(window * fs)
+        self.search = search
+        self.overlap = int(overlap * fs)
+        self.vad = vad
+        self.options = options
+        self.position = 0  # Start of the next window, in samples
+        self.words = []
+        self.busy = False  # Set by the caller while a window is queued
+        self._lock = threading.Lock()
+
+    def window_ready(self):
+        return len(self.buffer) - self.position >= self.window
+
+    def transcribe_next(self, final=False, is_cancelled=None):
+        # Returns the words that became final. With final=True everything
+        # left in the buffer is transcribed and all of its words are kept.
+        # A cancelled window raises transcription.Cancelled and leaves the
+        # position unchanged.
+        with self._lock:
+            start = self.position
+            stop = len(self.buffer) if final else start + self.window
+            if stop - start <= 0:
+                return []
+            audio = self.buffer.read(start, stop)
+            cut = len(audio) if final else quiet_point(audio, self.fs, self.search)
+
+            prompt = "".join(w["word"] for w in self.words[-50:]).strip() or None
+            result = transcription.transcribe(audio, self.model_name, fs=self.fs, cache=False, vad=self.vad,
+                                              initial_prompt=prompt, is_cancelled=is_cancelled, **self.options)
+
+            offset = start / self.fs
+            cut_time = offset + cut / self.fs
+            last_end = self.words[-1]["end"] if self.words else 0.0
+            new_words = []
+            for segment in result["segments"]:
+                for word in segment.get("words", []):
+                    word = dict(word, start=word["start"] + offset, end=word["end"] + offset)
+                    if (word["start"] + word["end"]) / 2 <= last_end:
+                        continue  # Already committed by the previous window
+                    if not final and word["start"] >= cut_time:
+                        continue  # Belongs to the next window
+                    new_words.append(word)
+
+            self.words.extend(new_words)
+            self.position = stop if final else max(start + cut - self.overlap, start + 1)
+            return new_words
+
+    def finish(self, is_cancelled=None):
+        return self.transcribe_next(final=True, is_cancelled=is_cancelled)
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import threading
+import unittest
+
+import torch
+
+from analysis_jobs import AnalysisQueue
+from transcription_backends import WhisperBackend
+
+
+class FakeRoot:
+    # Stands in for the Tk root: after() only records the callback, the test
+    # runs it by calling tick()
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def tick(self):
+        callbacks, self.scheduled = self.scheduled, []
+        for callback in callbacks:
+            callback()
+
+
+class EndlessModel(torch.nn.Module):
+    # A model whose transcribe() never finishes on its own: it keeps running
+    # decoder steps, like Whisper on a very long take
+    def __init__(self):
+        super().__init__()
+        self.decoder = torch.nn.Linear(4, 4)
+        self.running = threading.Event()
+
+    def transcribe(self, audio, **options):
+        self.running.set()
+        while True:
+            self.decoder(torch.zeros(1, 4))
+
+
+class AnalysisQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.analysis = AnalysisQueue(self.root, max_workers=1)
+        self.addCleanup(self.analysis.shutdown)
+
+    def run_until(self, condition, ticks=200):
+        for _ in range(ticks):
+            self.root.tick()
+            if condition():
+                return
+            threading.Event().wait(0.01)
+        self.fail("results were never delivered")
+
+    def test_failing_callback_does_not_stop_later_results(self):
+        job = self.analysis.new_job()
+        delivered = []
+
+        def broken(result):
+            raise ValueError("bad plot")
+
+        self.analysis.submit(job, "first", lambda job: 1, broken)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.run_until(lambda: not job.pending)
+        self.analysis.submit(job, "second", lambda job: 2, delivered.append)
+        self.run_until(lambda: delivered)
+        self.assertEqual(delivered, [2])
+        self.assertEqual(len(self.root.scheduled), 1)  # still polling
+
+    def test_cancelled_job_results_are_dropped(self):
+        job = self.analysis.new_job()
+        delivered = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def work(job):
+            started.set()
+            release.wait()
+            return 1
+
+        self.analysis.submit(job, "slow", work, delivered.append)
+        started.wait()
+        self.analysis.new_job()
+        release.set()
+        self.analysis.executor.shutdown(wait=True)
+        self.root.tick()
+        self.assertEqual(delivered, [])
+
+    def test_new_job_stops_a_running_transcription(self):
+        # With one worker the next take's work only runs once the abandoned
+        # transcription has given up the thread (and the model)
+        model = EndlessModel()
+        job = self.analysis.new_job()
+        errors, delivered = [], []
+        self.analysis.submit(job, "Transcribing",
+                             lambda job: WhisperBackend().transcribe(model, None, is_cancelled=lambda: job.cancelled),
+                             None, errors.append)
+        model.running.wait()
+        job = self.analysis.new_job()
+        self.analysis.submit(job, "Transcribing", lambda job: "next take", delivered.append)
+        self.run_until(lambda: delivered)
+        self.assertEqual(delivered, ["next take"])
+        self.assertEqual(errors, [])  # the Cancelled error belongs to the dropped job
+
+
+if __name__ == "__main__":
+    unittest.main()
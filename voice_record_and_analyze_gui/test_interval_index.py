@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from interval_index import IntervalIndex
+
+
+def brute_at(starts, ends, t):
+    # Row of the covering interval that started last (ties: the later row)
+    best = -1
+    for row, (start, end) in enumerate(zip(starts, ends)):
+        if start <= t < end and (best < 0 or start >= starts[best]):
+            best = row
+    return best
+
+
+class IntervalIndexTest(unittest.TestCase):
+    def test_words_and_gaps(self):
+        index = IntervalIndex.from_words([
+            {"word": " Hello", "start": 0.5, "end": 0.9},
+            {"word": " there", "start": 1.2, "end": 1.6},
+        ])
+        self.assertEqual(index.at(0.7), 0)
+        self.assertEqual(index.at(1.2), 1)
+        self.assertEqual(index.at(1.0), -1)  # between words
+        self.assertEqual(index.at(0.9), -1)  # ends are exclusive
+        self.assertEqual(index.at(0.1), -1)
+        self.assertEqual(index.label(index.at(1.5)), "there")
+        self.assertEqual(index.at(np.array([0.6, 1.0, 1.3])).tolist(), [0, -1, 1])
+
+    def test_overlap_walks_back_to_a_longer_interval(self):
+        # Row 0 spans everything; row 1 ends before t, so the walk-back has
+        # to step over it to find row 0
+        index = IntervalIndex([0.0, 1.0, 3.0], [10.0, 2.0, 4.0])
+        self.assertEqual(index.at(1.5), 1)  # the one that started last wins
+        self.assertEqual(index.at(2.5), 0)
+        self.assertEqual(index.at(5.0), 0)
+        self.assertEqual(index.at(10.0), -1)
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        starts = rng.uniform(0, 50, 200)
+        ends = starts + rng.exponential(2.0, 200)
+        index = IntervalIndex(starts, ends)
+        times = rng.uniform(-1, 60, 2000)
+        expected = [brute_at(starts, ends, t) for t in times]
+        self.assertEqual(index.at(times).tolist(), expected)
+        for t0, t1 in rng.uniform(0, 55, (50, 2)):
+            t0, t1 = min(t0, t1), max(t0, t1)
+            rows = [row for row in range(len(starts)) if starts[row] < t1 and ends[row] > t0]
+            self.assertEqual(sorted(index.overlapping(t0, t1).tolist()), rows)
+
+    def test_empty(self):
+        index = IntervalIndex([], [])
+        self.assertEqual(index.at(1.0), -1)
+        self.assertEqual(index.overlapping(0.0, 1.0).tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import transcription
+from audio_buffer import AudioBuffer
+from streaming_transcriber import StreamingTranscriber, quiet_point
+
+FS = 16000
+PERIOD = 0.5  # one word every half second
+WORD = 0.3  # spoken for 0.3 s, then 0.2 s of silence
+
+
+def spoken_words(seconds):
+    return [{"word": f" w{i}", "start": i * PERIOD, "end": i * PERIOD + WORD} for i in range(int(seconds / PERIOD))]
+
+
+def speech(seconds):
+    # Noise while a word is spoken, digital silence between words
+    t = np.arange(int(seconds * FS)) / FS
+    noise = np.random.default_rng(0).standard_normal(len(t)).astype(np.float32) * 0.1
+    return np.where(t % PERIOD < WORD, noise, 0.0).astype(np.float32)
+
+
+class StreamingTranscriberTest(unittest.TestCase):
+    def setUp(self):
+        self.buffer = AudioBuffer(block_size=FS * 30)
+        self.streamer = StreamingTranscriber(self.buffer, FS, "tiny", window=10.0, search=3.0, overlap=1.0)
+        self.words = spoken_words(47.0)
+        self.windows = []
+        patcher = mock.patch.object(transcription, "transcribe", self.fake_transcribe)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_transcribe(self, audio, model_name, fs, is_cancelled=None, **options):
+        # Whisper on one window: every word that starts in it, with times
+        # relative to the window and the last word cut at its end
+        if is_cancelled is not None and is_cancelled():
+            raise transcription.Cancelled()
+        offset = self.streamer.position / fs
+        end = offset + len(audio) / fs
+        self.windows.append((offset, end))
+        words = [dict(w, start=w["start"] - offset, end=min(w["end"], end) - offset)
+                 for w in self.words if offset <= w["start"] < end]
+        return {"text": "".join(w["word"] for w in words), "segments": [{"words": words}]}
+
+    def test_quiet_point_lands_in_a_pause(self):
+        audio = speech(10.0)
+        cut = quiet_point(audio, FS, 3.0) / FS
+        self.assertGreaterEqual(cut, 7.0)
+        self.assertGreaterEqual(cut % PERIOD, WORD)  # between two words
+
+    def test_windows_are_stitched_without_duplicates_or_gaps(self):
+        audio = speech(47.0)
+        stitched = []
+        for first in range(0, len(audio), FS // 2):  # audio arrives in half-second blocks
+            self.buffer.append(audio[first:first + FS // 2])
+            while self.streamer.window_ready():
+                stitched += self.streamer.transcribe_next()
+        stitched += self.streamer.finish()
+
+        self.assertGreater(len(self.windows), 4)
+        for (_, previous_end), (start, _) in zip(self.windows, self.windows[1:]):
+            self.assertLess(start, previous_end)  # consecutive windows overlap
+        self.assertEqual([w["word"] for w in stitched], [w["word"] for w in self.words])
+        for word, expected in zip(stitched, self.words):
+            self.assertAlmostEqual(word["start"], expected["start"], places=6)
+            self.assertAlmostEqual(word["end"], expected["end"], places=6)
+        self.assertEqual(self.streamer.words, stitched)
+
+    def test_cancelled_window_keeps_its_place(self):
+        self.buffer.append(speech(12.0))
+        with self.assertRaises(transcription.Cancelled):
+            self.streamer.transcribe_next(is_cancelled=lambda: True)
+        self.assertEqual(self.streamer.position, 0)
+        self.assertEqual(self.streamer.words, [])
+        self.assertTrue(self.streamer.transcribe_next())
+
+
+if __name__ == "__main__":
+    unittest.main()
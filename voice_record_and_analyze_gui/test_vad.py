@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from vad import SpeechCut, speech_regions
+
+FS = 16000
+
+
+class SpeechCutTest(unittest.TestCase):
+    def setUp(self):
+        self.audio = np.arange(5 * FS, dtype=np.float32)  # sample i holds i
+        self.cut = SpeechCut(self.audio, FS, [[1.0, 2.0], [3.0, 3.5]], gap=0.1)
+
+    def test_audio(self):
+        gap = np.zeros(int(0.1 * FS), dtype=np.float32)
+        expected = np.concatenate([self.audio[FS:2 * FS], gap, self.audio[3 * FS:int(3.5 * FS)]])
+        np.testing.assert_array_equal(self.cut.audio, expected)
+        self.assertAlmostEqual(self.cut.kept_fraction, 1.6 / 5)
+
+    def test_to_original(self):
+        # Cut times: region 1 at [0, 1), the gap at [1, 1.1), region 2 at [1.1, 1.6)
+        cut_times = [0.0, 0.5, 1.05, 1.1, 1.3, 1.6, 2.0]
+        np.testing.assert_allclose(self.cut.to_original(cut_times), [1.0, 1.5, 2.0, 3.0, 3.2, 3.5, 3.5])
+        self.assertAlmostEqual(float(self.cut.to_original(0.25)), 1.25)
+
+    def test_map_result(self):
+        result = {"segments": [{"start": 0.2, "end": 1.4,
+                                "words": [{"start": 0.2, "end": 0.6}, {"start": 1.2, "end": 1.4}]}]}
+        self.cut.map_result(result)
+        segment = result["segments"][0]
+        self.assertAlmostEqual(segment["start"], 1.2)
+        self.assertAlmostEqual(segment["end"], 3.3)
+        self.assertEqual([(round(w["start"], 6), round(w["end"], 6)) for w in segment["words"]],
+                         [(1.2, 1.6), (3.1, 3.3)])
+
+    def test_no_regions(self):
+        cut = SpeechCut(self.audio, FS, np.zeros((0, 2)))
+        self.assertEqual(len(cut.audio), 0)
+        np.testing.assert_array_equal(cut.to_original([0.5, 1.0]), [0.5, 1.0])
+
+
+class SpeechRegionsTest(unittest.TestCase):
+    def test_finds_bursts_in_quiet_noise(self):
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(6 * FS) * 1e-3).astype(np.float32)
+        t = np.arange(FS) / FS
+        for start in (1, 4):  # one second of a harmonic "vowel" at 1 s and at 4 s
+            audio[start * FS:(start + 1) * FS] += 0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 660 * t)
+        regions = speech_regions(audio, FS)
+        self.assertEqual(regions.shape, (2, 2))
+        np.testing.assert_allclose(regions, [[0.8, 2.2], [3.8, 5.2]], atol=0.05)
+
+    def test_silence(self):
+        self.assertEqual(speech_regions(np.zeros(FS, dtype=np.float32), FS).shape, (0, 2))
+        self.assertEqual(speech_regions(np.zeros(0, dtype=np.float32), FS).shape, (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+import whisper
+
+from whisper_models import get_model
+from transcription_backends import Cancelled, get_backend
+from wav_io import read_wav_pcm
+from result_cache import default_cache
+import vad as speech_vad
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+# Whisper installs kv-cache hooks on the model for each decode, so two
+# transcriptions must not share a model at the same time.
+_inference_lock = threading.Lock()
+
+
+def resample(audio, fs, target_fs=SAMPLE_RATE):
+    if fs == target_fs:
+        return audio
+    n = int(round(len(audio) * target_fs / fs))
+    return np.interp(np.arange(n) * (fs / target_fs), np.arange(len(audio)), audio).astype(np.float32)
+
+
+def load_pcm(path):
+    # int16 samples of 16 kHz PCM WAVs (the recorder's and the corpus'
+    # format), None for anything that needs ffmpeg.
+    if str(path).lower().endswith(".wav"):
+        wav = read_wav_pcm(path)
+        if wav is not None and wav[1] == SAMPLE_RATE:
+            return wav[0]
+    return None
+
+
+def load_audio(path):
+    pcm = load_pcm(path)
+    if pcm is not None:
+        return pcm.astype(np.float32) / 32768.0
+    return whisper.load_audio(str(path))
+
+
+def transcribe(audio, model_name="medium", fs=SAMPLE_RATE, device=None, cache=True, vad=False, backend=None,
+               is_cancelled=None, **options):
+    # audio is a numpy array sampled at fs (float32, or int16 PCM) or a path
+    # to an audio file. Results are looked up in the content-hash cache
+    # first; pass cache=False to always run the model, or a ResultCache.
+    # With vad=True only the detected speech is fed to the model and the
+    # timestamps are mapped back to the original recording. backend names
+    # one of transcription_backends.backends (default: $VOICE_ANALYSIS_BACKEND
+    # or "whisper"). is_cancelled() is polled while the model runs; once it
+    # returns True the transcription stops with Cancelled and frees the model.
+    pcm = None  # Original 16-bit samples, hashed as is when available
+    if isinstance(audio, np.ndarray):
+        if audio.dtype == np.int16 and fs == SAMPLE_RATE:
+            pcm = audio
+        audio = resample(np.ascontiguousarray(audio, dtype=np.float32) / (32768.0 if audio.dtype == np.int16 else 1.0), fs)
+    else:
+        pcm = load_pcm(audio)
+        audio = pcm.astype(np.float32) / 32768.0 if pcm is not None else whisper.load_audio(str(audio))
+
+    backend = get_backend(backend)
+    device = device or backend.default_device()
+    options.setdefault("word_timestamps", True)
+    options.setdefault("fp16", device == "cuda")
+    if cache is True:
+        cache = default_cache()
+    key_options = dict(options, vad=True) if vad else options
+    if backend.name != "whisper":
+        key_options = dict(key_options, backend=backend.name)
+    key = cache.key(audio if pcm is None else pcm, model_name, key_options) if cache else None
+    if key is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    cut = None
+    if vad:
+        cut = speech_vad.SpeechCut(audio, SAMPLE_RATE, speech_vad.speech_regions(audio, SAMPLE_RATE))
+        if not len(cut.audio):
+            return {"text": "", "segments": [], "language": options.get("language")}
+        audio = cut.audio
+
+    model = get_model(model_name, device, backend.name)
+    with _inference_lock:
+        if is_cancelled is not None and is_cancelled():
+            raise Cancelled()  # Given up while waiting for the model
+        result = backend.transcribe(model, audio, is_cancelled=is_cancelled, **options)
+    if cut is not None:
+        cut.map_result(result)
+    if key is not None:
+        cache.put(key, result)
+    return result
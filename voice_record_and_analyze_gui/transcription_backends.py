@@ -0,0 +1,131 @@
+import contextlib
+import os
+
+import torch
+import whisper
+
+
+backend_env = "VOICE_ANALYSIS_BACKEND"  # default backend when none is passed
+default_backend_name = "whisper"
+
+
+class Cancelled(Exception):
+    # Raised out of a running transcription once its is_cancelled() is true
+    pass
+
+
+@contextlib.contextmanager
+def cancel_hook(model, is_cancelled):
+    # Checks is_cancelled() before every decoder step of a PyTorch Whisper
+    # model, so an abandoned transcription stops within one token instead
+    # of holding the model until the end of the recording
+    if is_cancelled is None:
+        yield
+        return
+
+    def check(module, inputs):
+        if is_cancelled():
+            raise Cancelled()
+
+    handle = model.decoder.register_forward_pre_hook(check)
+    try:
+        yield
+    finally:
+        handle.remove()
+
+
+class WhisperBackend:
+    # openai-whisper in PyTorch: fp32 on CPU, fp16 on CUDA
+    name = "whisper"
+
+    def default_device(self):
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    def load(self, model_name, device):
+        return whisper.load_model(model_name, device=device)
+
+    def transcribe(self, model, audio, is_cancelled=None, **options):
+        with cancel_hook(model, is_cancelled):
+            return model.transcribe(audio, **options)
+
+
+def quantize_int8(model):
+    # Dynamic int8 quantization of every Linear layer (attention projections
+    # and MLPs, most of the compute). quantize_dynamic only swaps plain
+    # nn.Linear and whisper subclasses it, so its layers are first replaced
+    # by plain ones sharing the same weights.
+    for module in list(model.modules()):
+        for child_name, child in module.named_children():
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, child_name, plain)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class Int8WhisperBackend(WhisperBackend):
+    # openai-whisper with int8 Linear layers, CPU only
+    name = "whisper-int8"
+
+    def default_device(self):
+        return "cpu"
+
+    def load(self, model_name, device):
+        if device != "cpu":
+            raise ValueError("The whisper-int8 backend runs on CPU only")
+        return quantize_int8(whisper.load_model(model_name, device="cpu").eval())
+
+    def transcribe(self, model, audio, is_cancelled=None, **options):
+        options["fp16"] = False
+        return super().transcribe(model, audio, is_cancelled, **options)
+
+
+class FasterWhisperBackend:
+    # CTranslate2 int8 inference through the optional faster-whisper
+    # package, converted to openai-whisper's result structure
+    name = "faster-whisper"
+    unsupported = ("fp16", "verbose")
+
+    def default_device(self):
+        return "cuda" if torch.cuda.is_available() else "cpu"
+
+    def load(self, model_name, device):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The faster-whisper backend needs the faster-whisper package "
+                               "(pip install faster-whisper)") from None
+        return WhisperModel(model_name, device=device, compute_type="int8" if device == "cpu" else "float16")
+
+    def transcribe(self, model, audio, is_cancelled=None, **options):
+        for name in self.unsupported:
+            options.pop(name, None)
+        segments, info = model.transcribe(audio, **options)
+        result = {"text": "", "segments": [], "language": info.language}
+        for i, segment in enumerate(segments):  # decoded lazily, one window at a time
+            if is_cancelled is not None and is_cancelled():
+                raise Cancelled()
+            words = [
+                {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                for w in (segment.words or [])
+            ]
+            result["segments"].append({
+                "id": i, "seek": segment.seek, "start": segment.start, "end": segment.end, "text": segment.text,
+                "tokens": list(segment.tokens), "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob, "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob, "words": words,
+            })
+            result["text"] += segment.text
+        return result
+
+
+backends = {backend.name: backend for backend in (WhisperBackend(), Int8WhisperBackend(), FasterWhisperBackend())}
+
+
+def get_backend(name=None):
+    name = name or os.environ.get(backend_env) or default_backend_name
+    try:
+        return backends[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend {name!r} (choose from {', '.join(backends)})") from None
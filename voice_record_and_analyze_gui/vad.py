@@ -0,0 +1,107 @@
+import numpy as np
+
+
+FRAME = 0.025  # seconds per analysis frame
+HOP = 0.01
+
+
+def frame_features(audio, fs, frame=FRAME, hop=HOP):
+    # Per-frame energy (dB) and spectral flatness in the 100-4000 Hz speech
+    # band, for all frames with one FFT call
+    n = int(frame * fs)
+    step = int(hop * fs)
+    if len(audio) < n:
+        audio = np.pad(audio, (0, n - len(audio)))
+    frames = np.lib.stride_tricks.sliding_window_view(np.asarray(audio, dtype=np.float32), n)[::step]
+    power = np.abs(np.fft.rfft(frames * np.hanning(n).astype(np.float32), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(n, 1.0 / fs)
+    band = power[:, (freqs >= 100) & (freqs <= 4000)] + 1e-12
+    energy = 10 * np.log10(power.sum(axis=1) / n + 1e-12)
+    flatness = np.exp(np.log(band).mean(axis=1)) / band.mean(axis=1)
+    return energy, flatness
+
+
+def _runs(mask):
+    # (start, stop) frame indices of the True runs of a boolean array
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_regions(audio, fs, threshold_db=12.0, max_flatness=0.4, min_speech=0.15, min_silence=0.3, pad=0.2):
+    # [start, end] seconds of the speech in audio, as an (n, 2) array.
+    # A frame is speech when it is threshold_db above the noise floor (the
+    # 10th percentile of frame energy) and either clearly louder still or
+    # not noise-like (flat spectrum). Gaps shorter than min_silence are
+    # bridged, bursts shorter than min_speech dropped, and every region is
+    # padded so word onsets and releases are kept.
+    duration = len(audio) / fs
+    if not len(audio):
+        return np.zeros((0, 2))
+    energy, flatness = frame_features(audio, fs)
+    floor = np.percentile(energy, 10)
+    speech = (energy > floor + threshold_db) & ((energy > floor + 2 * threshold_db) | (flatness < max_flatness))
+
+    starts, stops = _runs(speech)
+    if not len(starts):
+        return np.zeros((0, 2))
+    gaps = (starts[1:] - stops[:-1]) * HOP
+    keep = np.concatenate([[True], gaps >= min_silence])  # a region starts after every long gap
+    starts = starts[keep]
+    stops = np.maximum.reduceat(stops, np.flatnonzero(keep))
+    long_enough = (stops - starts) * HOP >= min_speech
+    if not long_enough.any():
+        return np.zeros((0, 2))
+    regions = np.stack([starts[long_enough] * HOP - pad, (stops[long_enough] - 1) * HOP + FRAME + pad], axis=1)
+    regions = np.clip(regions, 0.0, duration)
+    # Padding can make neighbours overlap again
+    merged = [regions[0]]
+    for start, end in regions[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append(np.array([start, end]))
+    return np.array(merged)
+
+
+class SpeechCut:
+    # The speech regions of a recording joined into one shorter signal,
+    # with `gap` seconds of silence between them, and the mapping from times
+    # in the cut signal back to the original recording.
+    def __init__(self, audio, fs, regions, gap=0.1):
+        self.fs = fs
+        self.duration = len(audio) / fs
+        self.regions = np.asarray(regions, dtype=np.float64).reshape(-1, 2)
+        bounds = np.round(self.regions * fs).astype(np.int64)
+        silence = np.zeros(int(gap * fs), dtype=np.float32)
+        pieces = []
+        for i, (first, last) in enumerate(bounds):
+            if i:
+                pieces.append(silence)
+            pieces.append(np.asarray(audio[first:last], dtype=np.float32))
+        self.audio = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+        lengths = (bounds[:, 1] - bounds[:, 0]) / fs
+        # Where each region starts in the cut signal
+        self.cut_starts = np.concatenate([[0.0], np.cumsum(lengths + len(silence) / fs)[:-1]])
+        self.lengths = lengths
+
+    @property
+    def kept_fraction(self):
+        return len(self.audio) / self.fs / self.duration if self.duration else 0.0
+
+    def to_original(self, t):
+        # Cut-signal times -> original times. Times inside an inserted gap
+        # snap to the end of the region before it.
+        t = np.asarray(t, dtype=np.float64)
+        if not len(self.regions):
+            return t
+        k = np.clip(np.searchsorted(self.cut_starts, t, side="right") - 1, 0, len(self.regions) - 1)
+        offset = np.clip(t - self.cut_starts[k], 0.0, self.lengths[k])
+        return self.regions[k, 0] + offset
+
+    def map_result(self, result):
+        # Rewrites the segment and word times of a Whisper result in place
+        for segment in result["segments"]:
+            segment["start"], segment["end"] = self.to_original([segment["start"], segment["end"]]).tolist()
+            for word in segment.get("words", []):
+                word["start"], word["end"] = self.to_original([word["start"], word["end"]]).tolist()
+        return result
@@ -0,0 +1,85 @@
+import os
+import struct
+import wave
+
+import numpy as np
+
+
+class WavLayout:
+    # Where the PCM payload of a WAV file sits, read from its RIFF chunks
+    __slots__ = ("fs", "channels", "bits", "data_offset", "frames")
+
+    def __init__(self, fs, channels, bits, data_offset, frames):
+        self.fs = fs
+        self.channels = channels
+        self.bits = bits
+        self.data_offset = data_offset
+        self.frames = frames
+
+    @property
+    def duration(self):
+        return self.frames / self.fs
+
+
+def wav_layout(path):
+    # Reads only the chunk headers. Raises ValueError for anything that is
+    # not uncompressed integer PCM. A data chunk cut short by a truncated
+    # file is clipped to the bytes actually present.
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError("not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    raise ValueError("short fmt chunk")
+                tag, channels, fs, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if tag == 0xFFFE and len(fmt) >= 26:  # WAVE_FORMAT_EXTENSIBLE: real tag opens the sub-format GUID
+                    tag = struct.unpack("<H", fmt[24:26])[0]
+                if tag != 1:
+                    raise ValueError(f"unsupported format tag {tag}")
+                if not channels or not fs or block_align != channels * bits // 8:
+                    raise ValueError("inconsistent fmt chunk")
+                if chunk_size % 2:
+                    f.seek(1, 1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("data chunk before fmt chunk")
+                offset = f.tell()
+                data_size = min(chunk_size, size - offset)
+                return WavLayout(fs, channels, bits, offset, data_size // block_align)
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1)
+
+
+def read_wav_pcm(path):
+    # Returns (int16 mono samples, sample rate) for 16-bit PCM WAV files, or
+    # None when the file needs a real decoder.
+    try:
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
+                return None
+            channels = wf.getnchannels()
+            fs = wf.getframerate()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+    except (wave.Error, EOFError):
+        return None
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return pcm, fs
+
+
+def read_wav(path):
+    # Same as read_wav_pcm, with float32 samples in [-1, 1)
+    wav = read_wav_pcm(path)
+    if wav is None:
+        return None
+    pcm, fs = wav
+    return pcm.astype(np.float32) / 32768.0, fs
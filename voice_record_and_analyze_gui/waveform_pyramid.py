@@ -0,0 +1,89 @@
+import numpy as np
+from matplotlib.lines import Line2D
+
+
+class WaveformPyramid:
+    # Min/max envelopes of a recording at several resolutions. Level k keeps
+    # one (min, max) pair per base_bin * factor**k samples, so any visible
+    # range can be drawn with about as many points as there are pixels.
+    def __init__(self, audio, fs, base_bin=16, factor=4, min_bins=256):
+        self.audio = np.asarray(audio, dtype=np.float32)
+        self.fs = fs
+        self.levels = []  # (bin_size, mins, maxs)
+
+        bin_size = base_bin
+        n = len(self.audio) // bin_size
+        if n == 0:
+            return
+        frames = self.audio[:n * bin_size].reshape(n, bin_size)
+        mins, maxs = frames.min(axis=1), frames.max(axis=1)
+        rest = self.audio[n * bin_size:]
+        if rest.size:
+            mins = np.append(mins, rest.min())
+            maxs = np.append(maxs, rest.max())
+        self.levels.append((bin_size, mins, maxs))
+
+        while len(mins) > min_bins:
+            pad = (-len(mins)) % factor
+            if pad:
+                mins = np.append(mins, np.full(pad, mins[-1]))
+                maxs = np.append(maxs, np.full(pad, maxs[-1]))
+            mins = mins.reshape(-1, factor).min(axis=1)
+            maxs = maxs.reshape(-1, factor).max(axis=1)
+            bin_size *= factor
+            self.levels.append((bin_size, mins, maxs))
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.fs
+
+    def envelope(self, t0, t1, n_pixels):
+        # Returns (time, amplitude) covering [t0, t1] with at most a few points
+        # per pixel: raw samples when zoomed in, a min/max zigzag otherwise.
+        i0 = max(int(np.floor(t0 * self.fs)), 0)
+        i1 = min(int(np.ceil(t1 * self.fs)) + 1, len(self.audio))
+        if i1 <= i0:
+            return np.empty(0), np.empty(0)
+
+        samples_per_pixel = (i1 - i0) / max(n_pixels, 1)
+        level = None
+        for bin_size, mins, maxs in self.levels:
+            if bin_size > samples_per_pixel:
+                break
+            level = (bin_size, mins, maxs)
+
+        if level is None:
+            return np.arange(i0, i1) / self.fs, self.audio[i0:i1]
+
+        bin_size, mins, maxs = level
+        b0, b1 = i0 // bin_size, -(-i1 // bin_size)
+        centers = (np.arange(b0, b1) + 0.5) * bin_size / self.fs
+        time = np.repeat(centers, 2)
+        amplitude = np.column_stack((mins[b0:b1], maxs[b0:b1])).ravel()
+        return time, amplitude
+
+
+class WaveformView:
+    # Draws a WaveformPyramid into an axes and re-queries it whenever the
+    # x-limits change (toolbar zoom/pan, set_xlim), so the line never holds
+    # more points than the axes is wide.
+    def __init__(self, ax, pyramid, **line_kwargs):
+        self.ax = ax
+        self.pyramid = pyramid
+        self.line = Line2D([], [], **line_kwargs)
+        ax.add_line(self.line)
+        ax.set_xlim(0, pyramid.duration)
+        if len(pyramid.audio):
+            peak = float(np.abs(pyramid.audio).max()) or 1.0
+            ax.set_ylim(-peak * 1.05, peak * 1.05)
+        self.update()
+        self._cid = ax.callbacks.connect("xlim_changed", self.update)
+
+    def update(self, ax=None):
+        t0, t1 = self.ax.get_xlim()
+        width = max(int(self.ax.bbox.width), 100)
+        self.line.set_data(*self.pyramid.envelope(t0, t1, width))
+        self.ax.figure.canvas.draw_idle()
+
+    def disconnect(self):
+        self.ax.callbacks.disconnect(self._cid)
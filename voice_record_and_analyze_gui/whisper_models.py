@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+
+import torch
+
+from transcription_backends import get_backend
+
+
+def default_device(backend=None):
+    # The device a backend runs on when none is given: CUDA when available,
+    # except for backends that only run on the CPU
+    return get_backend(backend).default_device()
+
+
+def model_nbytes(model):
+    if not isinstance(model, torch.nn.Module):  # e.g. a CTranslate2 model
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    # Process-wide cache of loaded Whisper models. Each (name, device,
+    # backend) is loaded once and stays resident; when more than max_models are loaded or
+    # their weights exceed memory_budget bytes, the least recently used model
+    # is dropped.
+    def __init__(self, max_models=2, memory_budget=None):
+        self.max_models = max_models
+        self.memory_budget = memory_budget
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._loading = {}  # Per-key locks so a model is never loaded twice
+
+    def get(self, name, device=None, backend=None):
+        backend = get_backend(backend)
+        key = (name, device or backend.default_device(), backend.name)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key]
+            model = get_backend(key[2]).load(key[0], key[1])
+            with self._lock:
+                self._models[key] = model
+                self._sizes[key] = model_nbytes(model)
+                self._loading.pop(key, None)
+                self._evict(keep=key)
+            return model
+
+    def warm_up(self, name, device=None, backend=None):
+        # Loads the model on a daemon thread so the first transcription does
+        # not pay for it.
+        thread = threading.Thread(target=self._warm_up, args=(name, device, backend), daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self, name, device, backend):
+        try:
+            self.get(name, device, backend)
+        except Exception as e:
+            print(f"Could not preload Whisper model '{name}': {e}")
+
+    def _evict(self, keep):
+        evicted = False
+        while len(self._models) > 1:
+            over_count = self.max_models is not None and len(self._models) > self.max_models
+            over_budget = self.memory_budget is not None and sum(self._sizes.values()) > self.memory_budget
+            if not (over_count or over_budget):
+                break
+            key = next(k for k in self._models if k != keep)
+            del self._models[key]
+            del self._sizes[key]
+            evicted = True
+        if evicted and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def unload(self, name=None, device=None):
+        with self._lock:
+            for key in list(self._models):
+                if name is None or (key[0] == name and device in (None, key[1])):
+                    del self._models[key]
+                    del self._sizes[key]
+
+    def loaded(self):
+        with self._lock:
+            return list(self._models)
+
+
+registry = ModelRegistry()
+
+
+def get_model(name="medium", device=None, backend=None):
+    return registry.get(name, device, backend)
+
+
+def warm_up(name="medium", device=None, backend=None):
+    return registry.warm_up(name, device, backend)